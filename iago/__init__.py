@@ -1,6 +1,17 @@
 # import submodules you want to install
 
 from .iago import *
+from .streaming import *
+from .archive import *
+from .transcripts import *
+from .encoding import *
+from .governance import *
+from .deadline import *
+from .results import *
+from .logger import *
+from .language import *
+from .segmentation import *
+from .daemon import *
 
 __docformat__ = "restructuredtext"
 
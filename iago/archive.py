@@ -0,0 +1,331 @@
+"""
+archive
+-------
+This script contains
+the AudioArchive class
+(compressed and indexed storage of captured audio)
+
+Date: 2026-10-19
+
+Author: Lorenzo Coacci
+"""
+# + + + + + Libraries + + + + +
+# to flush the queue when Python exits
+import atexit
+# to manage paths and files
+import os
+import io
+# to decode FLAC
+import subprocess
+# to manage the index
+import sqlite3
+# to write in background
+import threading
+import queue
+# to manage ids and time
+import uuid
+import time
+# to manage speech recognition (speech 2 text)
+import speech_recognition as sr
+# for log funcs
+from .logger import iago_logger
+# to manage the results
+from .results import Result
+# + + + + + Libraries + + + + +
+
+
+# + + + + + Classes + + + + +
+class AudioArchive():
+    """
+    AudioArchive : an archive of the captured utterances
+
+    Every utterance is compressed on its own (FLAC) and appended to
+    the current segment file, an index (SQLite) keeps session,
+    timestamp, segment and byte offset so any utterance can be read
+    back by id without decoding the rest of the segment.
+    Compression and disk writes run in a background thread, the index
+    is committed every commit_rows utterances, every commit_interval
+    seconds, when the queue is drained and at exit
+
+    Parameters
+    ----------
+    path (optional): string
+        The archive folder
+    session (optional): string
+        The session id (a new one if None)
+    codec (optional): string
+        'flac' (compressed, needs the flac encoder) or 'wav'
+    max_segment_size (optional): int
+        Bytes after which a new segment file is started
+    commit_rows (optional): int
+        Utterances written before the index is committed
+    commit_interval (optional): float
+        Max seconds an utterance waits to be committed in the index
+    show_debug (optional) : bool
+        Show the debug info if it fails?
+
+    Attributes
+    ----------
+    session : string
+        The current session id
+
+    Methods
+    -------
+    append(audio, source=None, offset=0)
+        Archive an AudioData (non blocking)
+    replay(utterance_id)
+        Get back the AudioData of an utterance
+    transcribe(iago, ...)
+        Batch transcription of the archived utterances
+    """
+    CODECS = {"flac": ".flac", "wav": ".wav"}
+
+    def __init__(self, path="./iago_archive", session=None, codec="flac",
+                 max_segment_size=64 * 1024 * 1024, commit_rows=100,
+                 commit_interval=1.0, show_debug=True):
+        if codec not in self.CODECS:
+            raise ValueError("Please insert a valid codec {}".format(list(self.CODECS)))
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.session = session if session is not None else uuid.uuid4().hex[:12]
+        self.codec = codec
+        self.max_segment_size = max_segment_size
+        self.commit_rows = commit_rows
+        self.commit_interval = commit_interval
+        self.show_debug = show_debug
+        self.index_path = os.path.join(path, "index.db")
+
+        connection = self._connect()
+        connection.execute("""CREATE TABLE IF NOT EXISTS utterances (
+                                id TEXT PRIMARY KEY,
+                                session TEXT,
+                                timestamp REAL,
+                                source TEXT,
+                                source_offset REAL,
+                                segment INTEGER,
+                                offset INTEGER,
+                                length INTEGER,
+                                codec TEXT,
+                                sample_rate INTEGER,
+                                sample_width INTEGER,
+                                duration REAL)""")
+        connection.execute("CREATE INDEX IF NOT EXISTS utterances_session ON utterances (session, timestamp)")
+        connection.commit()
+        last = connection.execute("SELECT segment, codec FROM utterances ORDER BY segment DESC LIMIT 1").fetchone()
+        connection.close()
+        if last is None:
+            self.segment = 0
+        elif last[1] != codec:
+            # never mix codecs in a segment (reopened with another codec)
+            self.segment = last[0] + 1
+        else:
+            self.segment = last[0]
+
+        # background writer
+        self._queue = queue.Queue()
+        self._writer = threading.Thread(target=self._write_loop, name="iago-archive", daemon=True)
+        self._writer.start()
+        # the writer is a daemon thread, do not lose the queued utterances
+        atexit.register(self.close)
+
+    def append(self, audio, source=None, offset=0):
+        """
+        RETURN : Result {"status": True/False, "error": error_msg, "value": utterance_id},
+                 queue the audio to be archived (does not block)
+
+        Parameters
+        ----------
+        audio : AudioData
+            The audio captured (from speech_recognition)
+        source (optional): string
+            Where the audio comes from (mic, file path...)
+        offset (optional): float
+            The offset (seconds) of the audio inside source
+
+        Returns
+        -------
+        result : Result
+            {"status": True/False, "error": error_msg, "value": utterance_id}
+        """
+        if not self._writer.is_alive():
+            return Result(False, error="The archive is closed")
+        utterance_id = uuid.uuid4().hex
+        self._queue.put((utterance_id, time.time(), audio, source, offset))
+        return Result(value=utterance_id)
+
+    def flush(self):
+        """
+        RETURN : None, wait until every queued utterance is on disk
+        """
+        self._queue.join()
+
+    def close(self):
+        """
+        RETURN : None, flush and stop the background writer (called at exit too)
+        """
+        atexit.unregister(self.close)
+        if self._writer.is_alive():
+            self._queue.put(None)
+            self._writer.join()
+
+    def utterances(self, session=None):
+        """
+        RETURN : list of dict, the index rows (of a session or all)
+        """
+        connection = self._connect()
+        connection.row_factory = sqlite3.Row
+        if session is None:
+            rows = connection.execute("SELECT * FROM utterances ORDER BY timestamp").fetchall()
+        else:
+            rows = connection.execute("SELECT * FROM utterances WHERE session = ? ORDER BY timestamp",
+                                      (session,)).fetchall()
+        connection.close()
+        return [dict(row) for row in rows]
+
+    def replay(self, utterance_id, show_debug=None):
+        """
+        RETURN : Result {"status": True/False, "error": error_msg, "value": audio},
+                 the archived AudioData of an utterance
+
+        Parameters
+        ----------
+        utterance_id : string
+            The id returned by append
+        show_debug (optional) : bool
+            Show the debug info if it fails? (the archive one if None)
+
+        Returns
+        -------
+        result : Result
+            {"status": True/False, "error": error_msg, "value": audio}
+        """
+        if show_debug is None:
+            show_debug = self.show_debug
+        connection = self._connect()
+        row = connection.execute("SELECT segment, offset, length, codec FROM utterances WHERE id = ?",
+                                 (utterance_id,)).fetchone()
+        connection.close()
+        if row is None:
+            if show_debug:
+                iago_logger.error("Cannot find this utterance in the archive")
+            return Result(False, error="Cannot find this utterance in the archive")
+        try:
+            return Result(value=self._read(*row))
+        except Exception as e:
+            if show_debug:
+                iago_logger.error("Cannot read the utterance from the archive", exception=e)
+            return Result(False, error="Cannot read the utterance from the archive because -> {}", error_args=(e,))
+
+    def iter_audio(self, session=None):
+        """
+        RETURN : generator of (index row, AudioData), in time order
+        """
+        for row in self.utterances(session=session):
+            yield row, self._read(row["segment"], row["offset"], row["length"], row["codec"])
+
+    def transcribe(self, iago, recognizer='google', language='en-US',
+                   session=None, show_debug=True, **kwargs):
+        """
+        RETURN : list of {"id", "session", "timestamp", "status", "error", "value"},
+                 the archived utterances recognized again
+
+        Parameters
+        ----------
+        iago : Iago
+            The Iago object used to recognize
+        recognizer (optional): string
+            The API/engine to recognize speech
+        language (optional): string
+            The language to recognize
+        session (optional): string
+            Only this session (all if None)
+        show_debug (optional) : bool
+            Show the debug info if it fails?
+
+        Returns
+        -------
+        results : list
+            One dict for each utterance
+        """
+        results = []
+        for row, audio in self.iter_audio(session=session):
+            result = iago.speech_to_text(audio, recognizer=recognizer, language=language,
+                                         show_debug=show_debug, **kwargs)
+            results.append({"id": row["id"], "session": row["session"],
+                            "timestamp": row["timestamp"], "status": result["status"],
+                            "error": result["error"], "value": result["value"]})
+        return results
+
+    def _connect(self):
+        connection = sqlite3.connect(self.index_path, timeout=30)
+        connection.execute("PRAGMA journal_mode=WAL")
+        return connection
+
+    def _segment_path(self, segment, codec):
+        return os.path.join(self.path, "segment-{:06d}{}".format(segment, self.CODECS[codec]))
+
+    def _read(self, segment, offset, length, codec):
+        # every utterance is a complete stream, read only its bytes
+        # (the codec of the row, the archive may have been reopened with another)
+        with open(self._segment_path(segment, codec), "rb") as f:
+            f.seek(offset)
+            data = f.read(length)
+        if data[:4] == b"fLaC":
+            # decode here, AudioFile cannot rewind a file object for FLAC
+            process = subprocess.Popen([sr.get_flac_converter(), "--stdout", "--totally-silent",
+                                        "--decode", "-"],
+                                       stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+            data, _ = process.communicate(data)
+        with sr.AudioFile(io.BytesIO(data)) as source:
+            return sr.Recognizer().record(source)
+
+    def _encode(self, audio):
+        if self.codec == "flac":
+            return audio.get_flac_data()
+        return audio.get_wav_data()
+
+    def _write_loop(self):
+        connection = self._connect()
+        pending = 0
+        committed_at = time.time()
+        while True:
+            item = self._queue.get()
+            if item is None:
+                connection.commit()
+                connection.close()
+                self._queue.task_done()
+                return
+            try:
+                self._write(connection, *item)
+                pending += 1
+            except Exception as e:
+                if self.show_debug:
+                    iago_logger.error("Cannot archive the utterance", exception=e)
+            finally:
+                # commit the index in batches (a steady capture never drains the queue)
+                if self._queue.empty() or pending >= self.commit_rows or \
+                        time.time() - committed_at >= self.commit_interval:
+                    try:
+                        connection.commit()
+                        pending = 0
+                        committed_at = time.time()
+                    except Exception as e:
+                        if self.show_debug:
+                            iago_logger.warning("Cannot commit the archive index -> {}", e)
+                self._queue.task_done()
+
+    def _write(self, connection, utterance_id, timestamp, audio, source, source_offset):
+        data = self._encode(audio)
+        segment_path = self._segment_path(self.segment, self.codec)
+        if os.path.exists(segment_path) and os.path.getsize(segment_path) + len(data) > self.max_segment_size:
+            self.segment += 1
+            segment_path = self._segment_path(self.segment, self.codec)
+        with open(segment_path, "ab") as f:
+            offset = f.tell()
+            f.write(data)
+        duration = len(audio.frame_data) / float(audio.sample_rate * audio.sample_width)
+        connection.execute("INSERT INTO utterances VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                           (utterance_id, self.session, timestamp, source, source_offset,
+                            self.segment, offset, len(data), self.codec,
+                            audio.sample_rate, audio.sample_width, duration))
+# + + + + + Classes + + + + +
@@ -0,0 +1,110 @@
+"""
+cli
+---
+This script contains
+the iago command
+(start the daemon and send it commands from the shell)
+
+Date: 2026-10-19
+
+Author: Lorenzo Coacci
+"""
+# + + + + + Libraries + + + + +
+# to parse the command line
+import argparse
+# to print the values
+import json
+# to resolve the paths of the user
+import os
+# to write the errors and exit
+import sys
+# to talk with the daemon
+from .daemon import IagoDaemon, IagoClient
+# + + + + + Libraries + + + + +
+
+
+# + + + + + Functions + + + + +
+def build_parser():
+    """
+    RETURN : argparse.ArgumentParser, the iago command line
+    """
+    parser = argparse.ArgumentParser(prog="iago", description="Iago, a Python speaking assistant")
+    parser.add_argument("--socket", default=None, help="the daemon socket (default $IAGO_SOCKET or per user)")
+    commands = parser.add_subparsers(dest="command")
+    commands.required = True
+
+    daemon = commands.add_parser("daemon", help="run the daemon (keeps Iago loaded)")
+    daemon.add_argument("--quiet", action="store_true", help="do not show the debug info")
+
+    say = commands.add_parser("say", help="say a text")
+    say.add_argument("text", nargs="+")
+    say.add_argument("--volume", type=float, default=None)
+    say.add_argument("--voice-speed", type=float, default=None)
+    say.add_argument("--voice-name", default=None)
+
+    transcribe = commands.add_parser("transcribe", help="convert a WAV file to text")
+    transcribe.add_argument("path")
+    transcribe.add_argument("--recognizer", default="google")
+    transcribe.add_argument("--language", default="en-US")
+    transcribe.add_argument("--offset", type=float, default=0)
+    transcribe.add_argument("--duration", type=float, default=None)
+    transcribe.add_argument("--speakers", type=int, nargs="+", default=None,
+                            help="only these speakers (0 speaks first)")
+    transcribe.add_argument("--no-reduce-noise", dest="reduce_noise", action="store_false")
+    transcribe.add_argument("--timeout", type=float, default=None)
+
+    listen = commands.add_parser("listen", help="listen a sentence from the mic")
+    listen.add_argument("--recognizer", default="google")
+    listen.add_argument("--language", default="en-US")
+    listen.add_argument("--trigger-string", default="", help="wait for a sentence with this")
+    listen.add_argument("--reply", dest="skip_reply", action="store_false", help="say the reply first")
+    listen.add_argument("--timeout", type=float, default=None)
+    listen.add_argument("--phrase-time-limit", type=float, default=None)
+    listen.add_argument("--turn-timeout", type=float, default=None)
+
+    commands.add_parser("ping", help="check the daemon is up")
+    commands.add_parser("reload", help="reload Iago in the daemon")
+    commands.add_parser("stop", help="stop the daemon")
+    return parser
+
+
+def main(argv=None):
+    """
+    RETURN : int, the exit code (0 ok, 1 failed, 2 no daemon)
+    """
+    args = vars(build_parser().parse_args(argv))
+    socket_path = args.pop("socket")
+    command = args.pop("command")
+
+    if command == "daemon":
+        IagoDaemon(socket_path=socket_path, show_debug=not args["quiet"]).serve_forever()
+        return 0
+    if command == "say":
+        args["text"] = " ".join(args["text"])
+    if command == "transcribe":
+        # the daemon runs in another folder, send where the file really is
+        args["path"] = os.path.abspath(args["path"])
+    if command == "stop":
+        command = "shutdown"
+
+    try:
+        with IagoClient(socket_path) as client:
+            response = client.request(command, **args)
+    except OSError as e:
+        sys.stderr.write("Cannot reach the Iago daemon (start it with: iago daemon) -> {}\n".format(e))
+        return 2
+
+    if not response["status"]:
+        sys.stderr.write("{}\n".format(response["error"]))
+        return 1
+    value = response["value"]
+    if isinstance(value, str):
+        print(value)
+    elif value is not None:
+        print(json.dumps(value))
+    return 0
+# + + + + + Functions + + + + +
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,365 @@
+"""
+daemon
+------
+This script contains
+the IagoDaemon and IagoClient classes
+(a resident Iago controlled over a Unix socket)
+
+Date: 2026-10-19
+
+Author: Lorenzo Coacci
+"""
+# + + + + + Libraries + + + + +
+# to check the command arguments
+import inspect
+# to manage the messages
+import json
+# to manage the socket file
+import os
+# to reload on SIGHUP and stop on SIGTERM
+import signal
+# to talk with the clients
+import socket
+# to serve many clients at once
+import socketserver
+# to frame the messages
+import struct
+# to share the engines between the clients
+import threading
+# for log funcs
+from .logger import iago_logger
+# to manage the results
+from .results import Result, IagoError
+# the assistant to keep loaded
+from .iago import Iago
+# + + + + + Libraries + + + + +
+
+
+# + + + + + Functions + + + + +
+# a message is a 4 bytes (big endian) length and that many bytes of UTF-8 JSON
+HEADER = struct.Struct(">I")
+MAX_MESSAGE = 16 * 1024 * 1024
+
+
+def default_socket_path():
+    """
+    RETURN : string, the socket of the daemon ($IAGO_SOCKET or a per user path)
+    """
+    if os.environ.get("IAGO_SOCKET"):
+        return os.environ["IAGO_SOCKET"]
+    folder = os.environ.get("XDG_RUNTIME_DIR") or "/tmp"
+    return os.path.join(folder, "iago-{}.sock".format(os.getuid()))
+
+
+def send_message(sock, message):
+    """
+    RETURN : None, send a dict as one framed message
+    """
+    data = json.dumps(message, separators=(",", ":")).encode("utf-8")
+    sock.sendall(HEADER.pack(len(data)) + data)
+
+
+def recv_message(sock):
+    """
+    RETURN : dict, the next framed message (None if the other side closed)
+    """
+    header = _recv_exactly(sock, HEADER.size)
+    if header is None:
+        return None
+    size, = HEADER.unpack(header)
+    if size > MAX_MESSAGE:
+        raise ValueError("Message too big ({} bytes)".format(size))
+    data = _recv_exactly(sock, size)
+    if data is None:
+        raise ConnectionError("Connection closed in the middle of a message")
+    return json.loads(data.decode("utf-8"))
+
+
+def _recv_exactly(sock, size):
+    chunks = []
+    while size > 0:
+        chunk = sock.recv(size)
+        if not chunk:
+            if chunks:
+                raise ConnectionError("Connection closed in the middle of a message")
+            return None
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+# + + + + + Functions + + + + +
+
+
+# + + + + + Classes + + + + +
+class _Handler(socketserver.BaseRequestHandler):
+    # one thread per client, many requests per connection
+    def handle(self):
+        while True:
+            try:
+                request = recv_message(self.request)
+            except (ConnectionError, ValueError) as e:
+                iago_logger.warning("Bad message from a client -> {}", e)
+                return
+            if request is None:
+                return
+            send_message(self.request, self.server.iago_daemon.handle(request))
+
+
+class _Server(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+
+class IagoDaemon():
+    """
+    IagoDaemon : keep Iago (voices, recognizer, models) loaded
+
+    Serves say, transcribe and listen to many clients on a Unix
+    socket. The text 2 speech engine (while talking) and the
+    microphone (while recording a phrase) are used by one client at a
+    time, the recognitions run in parallel. SIGHUP (or the reload
+    command) builds a new Iago for the next requests while the running
+    ones finish on the old one, SIGTERM stops the daemon
+
+    The daemon runs in its own folder: the transcribe path must be
+    absolute (the iago command line resolves it)
+
+    Parameters
+    ----------
+    socket_path (optional): string
+        Where to listen (default_socket_path() if None)
+    iago_factory (optional): function
+        Builds the Iago to serve (called again on reload)
+    show_debug (optional) : bool
+        Show the debug info if it fails?
+
+    Methods
+    -------
+    serve_forever()
+        Serve until shutdown() (or SIGTERM)
+    handle(request)
+        {"command": command, ...} -> {"status", "error", "value", "timeout"}
+    reload()
+        Build a new Iago
+    shutdown()
+        Stop serving
+    """
+    COMMANDS = ("ping", "say", "transcribe", "listen", "reload", "shutdown")
+
+    def __init__(self, socket_path=None, iago_factory=None, show_debug=True):
+        self.socket_path = socket_path if socket_path is not None else default_socket_path()
+        if iago_factory is None:
+            def iago_factory():
+                return Iago(show_debug=show_debug)
+        self.iago_factory = iago_factory
+        self.show_debug = show_debug
+        # held only while talking / recording, never one inside the other
+        self.mic_lock = threading.Lock()
+        self.engine_lock = threading.Lock()
+        self.iago = self.iago_factory()
+        self.calibrated = False
+        self.server = None
+
+    def serve_forever(self):
+        """
+        RETURN : None, serve the clients until shutdown
+        """
+        self._remove_stale_socket()
+        # only this user can connect, from the moment the socket exists
+        umask = os.umask(0o077)
+        try:
+            self.server = _Server(self.socket_path, _Handler)
+        finally:
+            os.umask(umask)
+        self.server.iago_daemon = self
+        if threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGHUP, lambda signum, frame: self._in_thread(self.reload))
+            signal.signal(signal.SIGTERM, lambda signum, frame: self._in_thread(self.shutdown))
+        if self.show_debug:
+            iago_logger.info("Iago daemon listening on {}", self.socket_path)
+        try:
+            self.server.serve_forever()
+        finally:
+            self.server.server_close()
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+
+    def handle(self, request):
+        """
+        RETURN : dict, {"status", "error", "value", "timeout"} of the request
+
+        Parameters
+        ----------
+        request : dict
+            {"command": one of COMMANDS, ...the command arguments}
+        """
+        if not isinstance(request, dict):
+            return Result(False, error="Bad request, expected a JSON object").to_dict()
+        command = request.get("command")
+        if command not in self.COMMANDS:
+            return Result(False, error="Unknown command {}".format(command)).to_dict()
+        arguments = {key: value for key, value in request.items() if key != "command"}
+        method = getattr(self, "_" + command)
+        try:
+            # check the names only, a TypeError inside the command is a bug
+            inspect.signature(method).bind(**arguments)
+        except TypeError as e:
+            return Result(False, error="Bad arguments for {} -> {}".format(command, e)).to_dict()
+        try:
+            result = method(**arguments)
+        except IagoError as e:
+            result = e.result
+        except Exception as e:
+            iago_logger.error("The daemon cannot run {}", command, exception=e)
+            result = Result(False, error="Cannot run {} -> {}".format(command, e))
+        return result.to_dict()
+
+    def reload(self):
+        """
+        RETURN : Result, build a new Iago (the running requests finish on the old one)
+        """
+        try:
+            iago = self.iago_factory()
+        except Exception as e:
+            iago_logger.error("Cannot reload Iago, keeping the old one", exception=e)
+            return Result(False, error="Cannot reload Iago -> {}".format(e))
+        # every request reads self.iago once, the next ones get the new Iago
+        self.iago = iago
+        self.calibrated = False
+        if self.show_debug:
+            iago_logger.info("Iago reloaded")
+        return Result()
+
+    def shutdown(self):
+        """
+        RETURN : None, stop serving (from any thread but the serving one)
+        """
+        if self.server is not None:
+            self.server.shutdown()
+
+    def _ping(self):
+        return Result(value="pong")
+
+    def _say(self, text, volume=None, voice_speed=None, voice_name=None):
+        with self.engine_lock:
+            return self.iago.say(text, volume=volume, voice_speed=voice_speed,
+                                 voice_name=voice_name, show_debug=self.show_debug)
+
+    def _transcribe(self, path, recognizer='google', language='en-US', offset=0,
+                    duration=None, speakers=None, reduce_noise=True, timeout=None):
+        # the daemon folder is not the one of the client
+        if not os.path.isabs(path):
+            return Result(False, error="The path must be absolute, got {}".format(path))
+        # no lock: every recognition works on its own copy of the recognizer
+        return self.iago.audio_to_text(path, recognizer=recognizer,
+                                       language=language, reduce_noise=reduce_noise,
+                                       offset=offset, duration=duration, speakers=speakers,
+                                       timeout=timeout, show_debug=self.show_debug)
+
+    def _listen(self, recognizer='google', language='en-US', trigger_string="",
+                skip_reply=True, timeout=None, phrase_time_limit=None, turn_timeout=None):
+        iago = self.iago
+        turn = iago.new_deadline(turn_timeout)
+        if not skip_reply:
+            reply = "Speak, I'm listening"
+            if iago._spoken_language(language) == 'it-IT':
+                reply = "Parla pure, ti ascolto!"
+            with self.engine_lock:
+                iago.say(reply, show_debug=False)
+        while True:
+            # the mic only while recording, the recognition runs without locks
+            with self.mic_lock:
+                # the noise level is measured once, then kept warm
+                captured = iago.capture(reduce_noise=not self.calibrated, timeout=timeout,
+                                        phrase_time_limit=phrase_time_limit, deadline=turn,
+                                        show_debug=self.show_debug)
+                self.calibrated = self.calibrated or captured.status
+            if not captured.status:
+                return captured
+            try:
+                result = iago.speech_to_text(captured.value, recognizer=recognizer, language=language,
+                                             source_name="mic", deadline=turn, show_debug=self.show_debug)
+            except IagoError as e:
+                # not understood is part of the conversation, not an error
+                result = e.result
+            if result.timeout:
+                return result
+            if not result.status:
+                if result.error != iago.CANNOT_UNDERSTAND:
+                    return result
+                continue
+            sentence = result.value.lower()
+            if iago.stop_string in sentence:
+                return Result(False, error="Nothing recognized (or stop string)")
+            if trigger_string.lower() in sentence:
+                return Result(value=sentence)
+
+    def _reload(self):
+        return self.reload()
+
+    def _shutdown(self):
+        self._in_thread(self.shutdown)
+        return Result()
+
+    def _in_thread(self, function):
+        # server.shutdown() waits for serve_forever, never call it from a handler
+        threading.Thread(target=function, daemon=True).start()
+
+    def _remove_stale_socket(self):
+        if not os.path.exists(self.socket_path):
+            return
+        try:
+            IagoClient(self.socket_path).close()
+        except OSError:
+            # nobody is listening, a crashed daemon left it
+            os.unlink(self.socket_path)
+            return
+        raise RuntimeError("An Iago daemon is already running on {}".format(self.socket_path))
+
+
+class IagoClient():
+    """
+    IagoClient : send commands to an IagoDaemon
+
+    Parameters
+    ----------
+    socket_path (optional): string
+        The socket of the daemon (default_socket_path() if None)
+    timeout (optional): float
+        Max seconds to wait for an answer (None for no limit)
+
+    Methods
+    -------
+    request(command, **arguments)
+        Send a command and get {"status", "error", "value", "timeout"}
+    """
+    def __init__(self, socket_path=None, timeout=None):
+        self.socket_path = socket_path if socket_path is not None else default_socket_path()
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(timeout)
+        try:
+            self.sock.connect(self.socket_path)
+        except OSError:
+            self.sock.close()
+            raise
+
+    def request(self, command, **arguments):
+        """
+        RETURN : dict, {"status", "error", "value", "timeout"} of the daemon
+        """
+        send_message(self.sock, dict(arguments, command=command))
+        response = recv_message(self.sock)
+        if response is None:
+            raise ConnectionError("The Iago daemon closed the connection")
+        return response
+
+    def close(self):
+        """
+        RETURN : None, close the connection
+        """
+        self.sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+# + + + + + Classes + + + + +
@@ -0,0 +1,111 @@
+"""
+deadline
+--------
+This script contains
+the Deadline class and the TIMED_OUT result
+(time budgets for turns, sessions and recognition)
+
+Date: 2026-10-19
+
+Author: Lorenzo Coacci
+"""
+# + + + + + Libraries + + + + +
+# to manage time
+import time
+# to cancel from another thread
+import threading
+# + + + + + Libraries + + + + +
+
+
+# + + + + + Exceptions + + + + +
+class DeadlineExceeded(Exception):
+    """The time budget ran out (or the deadline was cancelled)"""
+# + + + + + Exceptions + + + + +
+
+
+# + + + + + Classes + + + + +
+class _TimedOut():
+    # falsy like the None returned on errors, but distinct
+    def __bool__(self):
+        return False
+
+    def __repr__(self):
+        return "TIMED_OUT"
+
+
+TIMED_OUT = _TimedOut()
+
+
+class Deadline():
+    """
+    Deadline : a time budget that can be split between stages
+
+    A deadline expires after timeout seconds or when any of its
+    parents expires, cancel() expires it (and all its children) now
+
+    Parameters
+    ----------
+    timeout (optional): float
+        Seconds from now (None for no limit of its own)
+    parents (optional): list
+        The Deadlines this one cannot outlive (ex: the session)
+
+    Attributes
+    ----------
+    expired : bool
+        No time left (or cancelled)?
+
+    Methods
+    -------
+    remaining(cap=None)
+        Seconds left (None if unlimited), at most cap
+    child(timeout=None)
+        A new Deadline inside this one
+    cancel()
+        Expire now
+    """
+    def __init__(self, timeout=None, parents=()):
+        self.expires = None if timeout is None else time.monotonic() + timeout
+        self.parents = tuple(parent for parent in parents if parent is not None)
+        self._cancelled = threading.Event()
+
+    def remaining(self, cap=None):
+        """
+        RETURN : float, the seconds left at most cap (None if unlimited)
+        """
+        if self._cancelled.is_set():
+            return 0.0
+        left = cap
+        if self.expires is not None:
+            own = max(0.0, self.expires - time.monotonic())
+            left = own if left is None else min(left, own)
+        for parent in self.parents:
+            inherited = parent.remaining()
+            if inherited is not None:
+                left = inherited if left is None else min(left, inherited)
+        return left
+
+    @property
+    def expired(self):
+        left = self.remaining()
+        return left is not None and left <= 0
+
+    def child(self, timeout=None):
+        """
+        RETURN : Deadline, a budget of timeout seconds inside this one
+        """
+        return Deadline(timeout, parents=(self,))
+
+    def cancel(self):
+        """
+        RETURN : None, expire now
+        """
+        self._cancelled.set()
+
+    def check(self):
+        """
+        RETURN : None, raise DeadlineExceeded if expired
+        """
+        if self.expired:
+            raise DeadlineExceeded("Deadline exceeded")
+# + + + + + Classes + + + + +
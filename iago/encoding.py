@@ -0,0 +1,229 @@
+"""
+encoding
+--------
+This script contains
+the UploadEncoder class
+(shrink the audio before sending it to a recognizer)
+
+Date: 2026-10-19
+
+Author: Lorenzo Coacci
+"""
+# + + + + + Libraries + + + + +
+# to manage data - pandas
+import pandas as pd
+# to manage the samples
+import numpy as np
+# to share the stats between threads
+import threading
+# to manage speech recognition (speech 2 text)
+import speech_recognition as sr
+# + + + + + Libraries + + + + +
+
+
+# + + + + + Functions + + + + +
+def resample(samples, from_rate, to_rate, taps=63):
+    """
+    RETURN : numpy int16 array, the samples at to_rate
+
+    Downsampling applies a windowed-sinc low-pass filter at the new
+    Nyquist frequency first, so the high frequencies do not fold back
+
+    Parameters
+    ----------
+    samples : numpy array
+        The mono samples (int16)
+    from_rate : int
+        The sample rate of samples
+    to_rate : int
+        The new sample rate
+    taps (optional): int
+        The length of the anti-alias filter
+    """
+    if from_rate == to_rate or len(samples) == 0:
+        return samples
+    x = samples.astype(np.float64)
+    if to_rate < from_rate:
+        # cutoff a bit under the new Nyquist (cycles per sample)
+        cutoff = 0.45 * to_rate / from_rate
+        n = np.arange(taps) - (taps - 1) / 2.0
+        h = 2 * cutoff * np.sinc(2 * cutoff * n) * np.hamming(taps)
+        delay = (taps - 1) // 2
+        x = np.convolve(x, h / h.sum())[delay:delay + len(x)]
+    if from_rate % to_rate == 0:
+        y = x[::from_rate // to_rate]
+    else:
+        t = np.arange(int(len(x) * to_rate / from_rate)) * (from_rate / float(to_rate))
+        y = np.interp(t, np.arange(len(x)), x)
+    return np.clip(np.round(y), -32768, 32767).astype(np.int16)
+
+
+def trim_silence(samples, sample_rate, threshold, frame_duration=0.01, padding=0.2):
+    """
+    RETURN : numpy array, the samples without leading and trailing silence
+
+    Parameters
+    ----------
+    samples : numpy array
+        The mono samples (int16)
+    sample_rate : int
+        The sample rate of samples
+    threshold : float
+        The RMS energy under which a frame is silence
+    frame_duration (optional): float
+        Seconds of each analysis frame
+    padding (optional): float
+        Seconds of silence kept around the speech
+    """
+    frame = max(1, int(sample_rate * frame_duration))
+    n_frames = len(samples) // frame
+    if n_frames == 0:
+        return samples
+    frames = samples[:n_frames * frame].astype(np.float64).reshape(n_frames, frame)
+    rms = np.sqrt(np.mean(frames ** 2, axis=1))
+    voiced = np.flatnonzero(rms > threshold)
+    if len(voiced) == 0:
+        # all silence: leave it to the recognizer
+        return samples
+    pad = int(padding / frame_duration)
+    start = max(0, voiced[0] - pad) * frame
+    end = min(n_frames, voiced[-1] + 1 + pad) * frame
+    if voiced[-1] + 1 + pad >= n_frames:
+        end = len(samples)
+    return samples[start:end]
+# + + + + + Functions + + + + +
+
+
+# + + + + + Classes + + + + +
+class UploadEncoder():
+    """
+    UploadEncoder : prepare the audio for each recognizer
+
+    Downsamples (with an anti-alias filter) to the rate each backend
+    really uses, converts to 16 bit and trims leading and trailing
+    silence, then keeps the bytes saved and the request latency
+    for every backend
+
+    Parameters
+    ----------
+    profiles (optional): dict
+        {backend: {"sample_rate": rate, "sample_width": width}}
+        to override the default PROFILES
+    trim (optional): bool
+        Trim leading and trailing silence?
+    silence_threshold (optional): float
+        The RMS energy of silence (the recognizer energy_threshold if None)
+    padding (optional): float
+        Seconds of silence kept around the speech
+
+    Methods
+    -------
+    encode(audio, backend)
+        The AudioData to send to backend
+    add_bytes(backend, bytes_in, bytes_out)
+        Record the PCM bytes of a request
+    add_latency(backend, seconds)
+        Record the duration of a request
+    report()
+        Bytes saved and latency per backend (DataFrame)
+    """
+    # the PCM each speech_recognition backend uses (the backend picks the
+    # upload container itself: FLAC for google/ibm, WAV for bing/wit/houndify)
+    PROFILES = {
+        "google": {"sample_rate": 16000, "sample_width": 2},
+        "google_cloud": {"sample_rate": 16000, "sample_width": 2},
+        "ibm": {"sample_rate": 16000, "sample_width": 2},
+        "bing": {"sample_rate": 16000, "sample_width": 2},
+        "houndify": {"sample_rate": 16000, "sample_width": 2},
+        "wit": {"sample_rate": 16000, "sample_width": 2},
+        "sphinx": {"sample_rate": 16000, "sample_width": 2},
+        "vosk": {"sample_rate": 16000, "sample_width": 2},
+    }
+
+    def __init__(self, profiles=None, trim=True, silence_threshold=None, padding=0.2):
+        self.profiles = dict(self.PROFILES)
+        if profiles is not None:
+            self.profiles.update(profiles)
+        self.trim = trim
+        self.silence_threshold = silence_threshold
+        self.padding = padding
+        self.stats = {}
+        self._lock = threading.Lock()
+
+    def encode(self, audio, backend, energy_threshold=300, record=True):
+        """
+        RETURN : AudioData, the (smaller) audio to send to backend
+
+        Parameters
+        ----------
+        audio : AudioData
+            The captured audio (from speech_recognition)
+        backend : string
+            The API/engine that will recognize it
+        energy_threshold (optional): float
+            The silence energy if silence_threshold is None
+        record (optional): bool
+            Record the bytes under backend? (False if another backend
+            may answer, then call add_bytes with the one that did)
+
+        Returns
+        -------
+        audio : AudioData
+            The encoded audio
+        """
+        profile = self.profiles.get(backend)
+        if profile is None:
+            return audio
+        # 16 bit is what every backend sends, and what numpy reads easily
+        raw = audio.get_raw_data(convert_width=2)
+        samples = np.frombuffer(raw, dtype=np.int16)
+        rate = min(audio.sample_rate, profile["sample_rate"])
+        samples = resample(samples, audio.sample_rate, rate)
+        if self.trim:
+            threshold = self.silence_threshold if self.silence_threshold is not None else energy_threshold
+            samples = trim_silence(samples, rate, threshold, padding=self.padding)
+        encoded = sr.AudioData(samples.tobytes(), rate, 2)
+        if profile["sample_width"] != 2:
+            encoded = sr.AudioData(encoded.get_raw_data(convert_width=profile["sample_width"]),
+                                   rate, profile["sample_width"])
+
+        if record:
+            self.add_bytes(backend, len(audio.frame_data), len(encoded.frame_data))
+        return encoded
+
+    def add_bytes(self, backend, bytes_in, bytes_out):
+        """
+        RETURN : None, record the PCM bytes captured and sent to backend
+        """
+        with self._lock:
+            stats = self.stats.setdefault(backend, {"calls": 0, "bytes_in": 0, "bytes_out": 0,
+                                                    "latency": 0.0, "timed_calls": 0})
+            stats["calls"] += 1
+            stats["bytes_in"] += bytes_in
+            stats["bytes_out"] += bytes_out
+
+    def add_latency(self, backend, seconds):
+        """
+        RETURN : None, record the duration of a request to backend
+        """
+        with self._lock:
+            stats = self.stats.setdefault(backend, {"calls": 0, "bytes_in": 0, "bytes_out": 0,
+                                                    "latency": 0.0, "timed_calls": 0})
+            stats["latency"] += seconds
+            stats["timed_calls"] += 1
+
+    def report(self):
+        """
+        RETURN : DataFrame, for each backend the calls, the PCM bytes
+                 before and after encoding, the bytes saved and the
+                 mean request latency (seconds)
+        """
+        with self._lock:
+            rows = [dict(backend=backend, **stats) for backend, stats in self.stats.items()]
+        df = pd.DataFrame(rows, columns=["backend", "calls", "bytes_in", "bytes_out",
+                                         "latency", "timed_calls"])
+        df["bytes_saved"] = df["bytes_in"] - df["bytes_out"]
+        df["saved_percent"] = 100.0 * df["bytes_saved"] / df["bytes_in"].where(df["bytes_in"] > 0)
+        df["mean_latency"] = df["latency"] / df["timed_calls"].where(df["timed_calls"] > 0)
+        return df.drop(columns=["latency", "timed_calls"]).set_index("backend")
+# + + + + + Classes + + + + +
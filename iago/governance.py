@@ -0,0 +1,415 @@
+"""
+governance
+----------
+This script contains
+the TokenBucket, CircuitBreaker and RequestGovernor classes
+(rate limit, retry and fail fast on the cloud recognizers)
+
+Date: 2026-10-19
+
+Author: Lorenzo Coacci
+"""
+# + + + + + Libraries + + + + +
+# to tell the transient errors from the others
+import http
+import re
+# to check the fallback backend is installed
+import importlib.util
+# to manage the shared state files
+import os
+import struct
+# to share the state between threads
+import threading
+# to manage time and jitter
+import time
+import random
+# to manage speech recognition errors
+import speech_recognition as sr
+# for log funcs
+from .logger import iago_logger
+# to respect the time budget
+from .deadline import DeadlineExceeded
+# to share the state between processes (POSIX only)
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+# + + + + + Libraries + + + + +
+
+
+# + + + + + Exceptions + + + + +
+class RateLimitError(sr.RequestError):
+    """The token bucket had no token before the timeout"""
+
+
+class CircuitOpenError(sr.RequestError):
+    """The backend is failing, the request was not sent"""
+# + + + + + Exceptions + + + + +
+
+
+# + + + + + Classes + + + + +
+class TokenBucket():
+    """
+    TokenBucket : a rate limiter shared by threads (and processes)
+
+    Parameters
+    ----------
+    rate : float
+        Tokens added per second
+    capacity : float
+        Max tokens (the burst size)
+    path (optional): string
+        A file to keep the bucket in, every process using the
+        same file shares the same bucket (None for this process only)
+
+    Methods
+    -------
+    try_acquire(tokens=1)
+        Take tokens if available (does not wait)
+    acquire(tokens=1, timeout=None)
+        Wait for the tokens (False after timeout)
+    """
+    _STATE = struct.Struct("dd")
+
+    def __init__(self, rate, capacity, path=None):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self.path = path if fcntl is not None else None
+        self._lock = threading.Lock()
+        self._tokens = self.capacity
+        self._updated = time.time()
+
+    def try_acquire(self, tokens=1):
+        """
+        RETURN : float, 0 if the tokens were taken, otherwise the
+                 seconds to wait before they are available
+        """
+        with self._lock:
+            if self.path is None:
+                self._tokens, self._updated, wait = self._take(self._tokens, self._updated, tokens)
+                return wait
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+                data = os.pread(fd, self._STATE.size, 0)
+                if len(data) == self._STATE.size:
+                    stored, updated = self._STATE.unpack(data)
+                else:
+                    stored, updated = self.capacity, time.time()
+                stored, updated, wait = self._take(stored, updated, tokens)
+                os.pwrite(fd, self._STATE.pack(stored, updated), 0)
+                return wait
+            finally:
+                os.close(fd)
+
+    def acquire(self, tokens=1, timeout=None):
+        """
+        RETURN : True if the tokens were taken, False after timeout
+
+        Parameters
+        ----------
+        tokens (optional): float
+            How many tokens
+        timeout (optional): float
+            Max seconds to wait (None to wait forever)
+        """
+        deadline = None if timeout is None else time.time() + timeout
+        while True:
+            wait = self.try_acquire(tokens)
+            if wait == 0:
+                return True
+            if deadline is not None:
+                if time.time() + wait > deadline:
+                    return False
+            time.sleep(wait)
+
+    def _take(self, stored, updated, tokens):
+        now = time.time()
+        stored = min(self.capacity, stored + max(0.0, now - updated) * self.rate)
+        if stored >= tokens:
+            return stored - tokens, now, 0
+        return stored, now, (tokens - stored) / self.rate
+
+
+class CircuitBreaker():
+    """
+    CircuitBreaker : stop calling a backend that keeps failing
+
+    After failure_threshold consecutive failures the circuit opens and
+    every call fails fast, after reset_timeout seconds one trial call
+    is let through (half open): a success closes the circuit again, a
+    failure (or a trial that ends without an answer) opens it again.
+    A trial that never reports back is replaced after reset_timeout
+
+    Parameters
+    ----------
+    failure_threshold (optional): int
+        Consecutive failures to open the circuit
+    reset_timeout (optional): float
+        Seconds before a trial call
+
+    Attributes
+    ----------
+    state : string
+        "closed", "open" or "half_open"
+    """
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self.trial_at = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """
+        RETURN : True if a call can be sent now
+        """
+        with self._lock:
+            if self.state == "closed":
+                return True
+            now = time.time()
+            if (self.state == "open" and now - self.opened_at >= self.reset_timeout) or \
+                    (self.state == "half_open" and now - self.trial_at >= self.reset_timeout):
+                # let one trial call through
+                self.state = "half_open"
+                self.trial_at = now
+                return True
+            return False
+
+    def is_open(self):
+        """
+        RETURN : True if allow() would refuse a call now (does not start a trial)
+        """
+        with self._lock:
+            now = time.time()
+            if self.state == "open":
+                return now - self.opened_at < self.reset_timeout
+            if self.state == "half_open":
+                return now - self.trial_at < self.reset_timeout
+            return False
+
+    def record_success(self):
+        """
+        RETURN : None, the backend answered
+        """
+        with self._lock:
+            self.state = "closed"
+            self.failures = 0
+
+    def record_failure(self):
+        """
+        RETURN : None, the backend failed
+        """
+        with self._lock:
+            self.failures += 1
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                self.state = "open"
+                self.opened_at = time.time()
+
+    def release(self):
+        """
+        RETURN : None, the call ended without an answer from the backend
+                 (not counted as a failure, but a trial call opens the circuit again)
+        """
+        with self._lock:
+            if self.state == "half_open":
+                self.state = "open"
+                self.opened_at = time.time()
+
+
+class RequestGovernor():
+    """
+    RequestGovernor : rate limit, retry and circuit breaker for the
+    cloud recognizers
+
+    Every backend has its own token bucket (shared by the processes
+    using the same state_dir) and circuit breaker, transient errors
+    (429, 5xx, connection failed) are retried with jittered exponential
+    backoff and while a circuit is open the calls go to the offline
+    fallback. The other request errors (bad key, quota, bad request)
+    are raised at once: retrying or falling back would hide them
+
+    Parameters
+    ----------
+    rate (optional): float
+        Requests per second for each backend
+    capacity (optional): float
+        Burst of requests for each backend
+    limits (optional): dict
+        {backend: (rate, capacity)} to override rate and capacity
+    state_dir (optional): string
+        Folder of the shared token buckets (None for this process only)
+    retries (optional): int
+        Retries after the first failed call
+    backoff (optional): float
+        The base backoff in seconds (doubles at every retry)
+    max_backoff (optional): float
+        Max backoff in seconds
+    failure_threshold (optional): int
+        Consecutive failures to open a circuit
+    reset_timeout (optional): float
+        Seconds an open circuit waits before a trial call
+    acquire_timeout (optional): float
+        Max seconds to wait for a token (None to wait forever)
+    fallback (optional): string
+        The offline backend to use while a circuit is open (None to
+        raise CircuitOpenError), it must be installed
+
+    Methods
+    -------
+    call(backend, function)
+        Call function(backend) with rate limit, retry and circuit breaker
+    is_transient(error)
+        Is a sr.RequestError worth a retry?
+    """
+    # local backends are not rate limited
+    OFFLINE = ("sphinx", "vosk")
+    # the module each offline fallback needs
+    FALLBACK_MODULES = {"sphinx": "pocketsphinx", "vosk": "vosk"}
+    # speech_recognition puts the HTTP reason (or the status) in the message
+    TRANSIENT_REASONS = tuple(status.phrase.lower() for status in http.HTTPStatus
+                              if status == 429 or status >= 500)
+    TRANSIENT_STATUS = re.compile(r"\b(429|5\d\d)\b")
+
+    def __init__(self, rate=5.0, capacity=10.0, limits=None, state_dir=None,
+                 retries=3, backoff=0.5, max_backoff=8.0,
+                 failure_threshold=5, reset_timeout=30.0,
+                 acquire_timeout=None, fallback=None):
+        module = self.FALLBACK_MODULES.get(fallback)
+        if module is not None and importlib.util.find_spec(module) is None:
+            raise ImportError("The {} fallback needs {}, install it with: pip install {}".format(
+                fallback, module, module))
+        self.rate = rate
+        self.capacity = capacity
+        self.limits = limits if limits is not None else {}
+        self.state_dir = state_dir
+        if state_dir is not None:
+            os.makedirs(state_dir, exist_ok=True)
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.acquire_timeout = acquire_timeout
+        self.fallback = fallback
+        self.buckets = {}
+        self.breakers = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, backend):
+        """
+        RETURN : TokenBucket, the token bucket of backend
+        """
+        with self._lock:
+            if backend not in self.buckets:
+                rate, capacity = self.limits.get(backend, (self.rate, self.capacity))
+                path = None
+                if self.state_dir is not None:
+                    path = os.path.join(self.state_dir, "{}.bucket".format(backend))
+                self.buckets[backend] = TokenBucket(rate, capacity, path=path)
+            return self.buckets[backend]
+
+    def breaker(self, backend):
+        """
+        RETURN : CircuitBreaker, the circuit breaker of backend
+        """
+        with self._lock:
+            if backend not in self.breakers:
+                self.breakers[backend] = CircuitBreaker(self.failure_threshold, self.reset_timeout)
+            return self.breakers[backend]
+
+    def call(self, backend, function, deadline=None, show_debug=True):
+        """
+        RETURN : (backend used, result of function)
+
+        Parameters
+        ----------
+        backend : string
+            The API/engine to call
+        function : function
+            function(backend) makes the request (raises sr.RequestError
+            on transient errors)
+        deadline (optional): Deadline
+            Do not wait for tokens or retry past it (raises DeadlineExceeded)
+        show_debug (optional) : bool
+            Show the debug info if it fails?
+
+        Returns
+        -------
+        result : tuple
+            (the backend that answered, what function returned)
+        """
+        if backend in self.OFFLINE:
+            return backend, function(backend)
+
+        breaker = self.breaker(backend)
+        if breaker.is_open():
+            return self._fallback(backend, function, show_debug=show_debug)
+
+        bucket = self.bucket(backend)
+        attempt = 0
+        while True:
+            # the token first: a rate limit wait never holds the trial call
+            budget = self.acquire_timeout
+            if deadline is not None:
+                budget = deadline.remaining(budget)
+            if not bucket.acquire(timeout=budget):
+                if budget != self.acquire_timeout:
+                    # the deadline, not the rate limit setting, stopped the wait
+                    raise DeadlineExceeded("No time left to wait for the {} rate limit".format(backend))
+                raise RateLimitError("Rate limit of {} reached".format(backend))
+            if not breaker.allow():
+                return self._fallback(backend, function, show_debug=show_debug)
+            try:
+                result = function(backend)
+            except sr.UnknownValueError:
+                # the service answered: it is healthy
+                breaker.record_success()
+                raise
+            except sr.RequestError as e:
+                if not self.is_transient(e):
+                    # the service answered (bad key, quota, bad request): not its health
+                    breaker.record_success()
+                    raise
+                breaker.record_failure()
+                if breaker.state == "open":
+                    if show_debug:
+                        iago_logger.warning("The {} circuit is open -> {}", backend, e)
+                    return self._fallback(backend, function, show_debug=show_debug)
+                if attempt >= self.retries:
+                    raise
+                # full jitter exponential backoff
+                sleep = random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+                if deadline is not None and deadline.remaining(sleep) < sleep:
+                    raise DeadlineExceeded("No time left to retry {} -> {}".format(backend, str(e)))
+                time.sleep(sleep)
+                attempt += 1
+                continue
+            except BaseException:
+                # not an answer of the service (a bug, an interrupt...)
+                breaker.release()
+                raise
+            breaker.record_success()
+            return backend, result
+
+    def is_transient(self, error):
+        """
+        RETURN : True if the sr.RequestError is worth a retry
+                 (429, 5xx or no connection)
+        """
+        message = str(error).lower()
+        if "connection failed" in message or "timed out" in message:
+            return True
+        if self.TRANSIENT_STATUS.search(message):
+            return True
+        return any(reason in message for reason in self.TRANSIENT_REASONS)
+
+    def _fallback(self, backend, function, show_debug=True):
+        if self.fallback is None or self.fallback == backend:
+            raise CircuitOpenError("The {} service is unhealthy, request not sent".format(backend))
+        if show_debug:
+            iago_logger.warning("Using {} while {} is unhealthy", self.fallback, backend)
+        return self.fallback, function(self.fallback)
+# + + + + + Classes + + + + +
@@ -17,13 +17,18 @@ import speech_recognition as sr
 import pyttsx3
 # to manage time
 import time
+# to give each request its own recognizer settings
+import copy
 # to play sounds
 from playsound import playsound
 # for log funcs
-from golog import (
-    error_print, warning_print,
-    ERROR_COLOR, info_print
-)
+from .logger import iago_logger, ERROR, WARNING
+# to manage the results
+from .results import Result, IagoError
+# to manage incremental (streaming) speech 2 text
+from .streaming import StreamingRecognizer
+# to manage time budgets
+from .deadline import Deadline, DeadlineExceeded, TIMED_OUT
 # + + + + + Libraries + + + + +
 
 
@@ -46,6 +51,22 @@ class Iago():
         The rate of speaking in % (can go over 100% ex: 150%)
     voice_name (optional): string
         The voice name (default Samantha - woman)
+    archive (optional) : AudioArchive
+        Where to archive the captured audio (None to discard it)
+    transcript_store (optional) : TranscriptStore
+        Where to save the recognized sentences (None to discard them)
+    upload_encoder (optional) : UploadEncoder
+        Downsample and trim the audio before recognition (None to send it as is)
+    governor (optional) : RequestGovernor
+        Rate limit, retry and circuit breaker for the cloud recognizers
+    language_router (optional) : LanguageRouter
+        Picks language and backend when you ask for language='auto'
+    speaker_segmenter (optional) : SpeakerSegmenter
+        Splits the recordings in speaker turns (see audio_to_text speakers)
+    logger (optional) : Logger
+        Where to log (the iago logger if None)
+    raise_errors (optional) : bool
+        Raise IagoError instead of returning a failed Result?
     show_debug (optional) : bool
             Show the debug info if it fails?
 
@@ -56,24 +77,34 @@ class Iago():
     -------
 
     """
+    # the error of an audio with no words in it (not a failure of the backend)
+    CANNOT_UNDERSTAND = "Cannot understand audio"
+
     def __init__(self, volume=0.9, voice_speed=150, voice_name="Samantha",
-                 trigger_string="iago", stop_string="exit", show_debug=True):
+                 trigger_string="iago", stop_string="exit", archive=None,
+                 transcript_store=None, upload_encoder=None,
+                 governor=None, language_router=None, speaker_segmenter=None,
+                 logger=None, raise_errors=False, show_debug=True):
+        self.logger = logger if logger is not None else iago_logger
+        # setup problems are logged, not raised
+        self.raise_errors = False
+
         # welcome - begin setup
         if show_debug:
-            info_print("""\n\t* * * Iago * * *\n""")
-            info_print("Begin setup...")
+            self.logger.info("""\n\t* * * Iago * * *\n""")
+            self.logger.info("Begin setup...")
 
         # set recognizer [speech 2 text]
         try:
             self.recognizer = sr.Recognizer()
         except Exception as e:
-            error_print("Cannot load recognizer object from speech_recognition package", exception=e)
+            self.logger.error("Cannot load recognizer object from speech_recognition package", exception=e)
 
         # set speak engine to talk [text 2 speech]
         try:
             self.engine = pyttsx3.init()
         except Exception as e:
-            error_print("Cannot load engine to speak from pyttsx3. Are you using Python3?", exception=e)
+            self.logger.error("Cannot load engine to speak from pyttsx3. Are you using Python3?", exception=e)
 
         # initialize default settings
         self.volume = 0.9
@@ -81,21 +112,32 @@ class Iago():
         self.voice_name = "Samantha"
         self.trigger_string = trigger_string
         self.stop_string = stop_string
+        self.archive = archive
+        self.transcript_store = transcript_store
+        self.upload_encoder = upload_encoder
+        self.governor = governor
+        self.language_router = language_router
+        self.speaker_segmenter = speaker_segmenter
+        # the budget of the whole session (see start_session)
+        self.session_deadline = None
+        # streaming decoders (models are slow to load, keep them warm)
+        self.streaming_recognizers = {}
 
         # set user settings
         self.set_volume(volume)
         self.set_voice_speed(voice_speed)
         self.set_voice(voice_name)
+        self.raise_errors = raise_errors
 
         # end setup
         if show_debug:
-            info_print("End setup...")
+            self.logger.info("End setup...")
 
     def say(self, string_to_say,
             volume=None, voice_speed=None,
             voice_name=None, show_debug=True):
         """
-        RETURN : {"status": True/False, "error": error_msg },
+        RETURN : Result {"status": True/False, "error": error_msg },
                  say the string
 
         Parameters
@@ -113,7 +155,7 @@ class Iago():
 
         Returns
         -------
-        status : dict
+        result : Result
             {"status": True/False, "error": error_msg }
         """
         # set default
@@ -126,61 +168,45 @@ class Iago():
 
         # parameters validation
         if volume < 0 or volume > 1:
-            if show_debug:
-                error_print("Please insert a valid volume [from 0.0 to 1.0]")
-            return {"status": False, "error": "Please insert a valid volume [from 0.0 to 1.0]"}
+            return self._fail("Please insert a valid volume [from 0.0 to 1.0]", show_debug=show_debug)
         if voice_speed <= 0:
-            if show_debug:
-                error_print("Please insert a valid speed [> 0]")
-            return {"status": False, "error": "Please insert a valid speed [> 0]"}
+            return self._fail("Please insert a valid speed [> 0]", show_debug=show_debug)
 
         # pyttsx3 setup change
         try:
             self.engine.setProperty("rate", voice_speed)   # Speed percent (can go over 100)
             self.engine.setProperty("volume", volume)      # Volume 0-1
         except Exception as e:
-            if show_debug:
-                error_print("Cannot change voice speed and volume", exception=e)
-            return {"status": False, "error": "Cannot change voice speed and volume because -> {}".format(str(e))}
+            return self._fail("Cannot change voice speed and volume", exception=e, show_debug=show_debug)
         # voices available
         try:
             voices = self.engine.getProperty('voices')
         except Exception as e:
-            if show_debug:
-                error_print("Cannot get list of al voices", exception=e)
-            return {"status": False, "error": "Cannot get list of al voices because -> {}".format(str(e))}
+            return self._fail("Cannot get list of al voices", exception=e, show_debug=show_debug)
         # voice id
         voice_id = ""
         for voice in voices:
             if voice.name == voice_name:
                 voice_id = voice.id
         if voice_id == "":
-            if show_debug:
-                error_print("Cannot find a voice with this name")
-            return {"status": False, "error": "Cannot find a voice with this name"}
+            return self._fail("Cannot find a voice with this name", show_debug=show_debug)
         else:
             try:
                 self.engine.setProperty('voice', voice_id)
             except Exception as e:
-                if show_debug:
-                    error_print("Cannot set this voice", exception=e)
-                return {"status": False, "error": "Cannot set this voice because -> {}".format(str(e))}
+                return self._fail("Cannot set this voice", exception=e, show_debug=show_debug)
 
         # say the string
         try:
             self.engine.say(string_to_say)
         except Exception as e:
-            if show_debug:
-                error_print("Cannot say that string", exception=e)
-            return {"status": False, "error": "Cannot say that string, because -> {}".format(str(e))}
+            return self._fail("Cannot say that string", exception=e, show_debug=show_debug)
 
         # run the say command and talk
         try:
             self.engine.runAndWait()
         except Exception as e:
-            if show_debug:
-                error_print("Cannot run the speech engine and talk", exception=e)
-            return {"status": False, "error": "Cannot run the speech engine and talk, because -> {}".format(str(e))}
+            return self._fail("Cannot run the speech engine and talk", exception=e, show_debug=show_debug)
 
         # pyttsx3 restore original values
         try:
@@ -189,14 +215,16 @@ class Iago():
             self.set_voice(self.voice_name)                     # restore voice
         except Exception as e:
             if show_debug:
-                warning_print("Cannot restore default Iago proprieties")
+                self.logger.warning("Cannot restore default Iago proprieties", exception=e)
 
-        return {"status": True, "error": ""}
+        return Result()
 
     def speech_to_text(self, audio, recognizer='google', language='en-US',
+                       source_name=None, source_offset=None,
+                       timeout=None, deadline=None, energy_threshold=None,
                        show_debug=True, **kwargs):
         """
-        RETURN : {"status": True/False, "error": error_msg, "value": value},
+        RETURN : Result {"status": True/False, "error": error_msg, "value": value},
                  the sentence (string) of the user
 
         Parameters
@@ -206,52 +234,174 @@ class Iago():
         recognizer (optional): string
             The API/engine to recognize speech
         language (optional): string
-            The language to recognize
+            The language to recognize ('auto' to ask the language_router)
+        source_name (optional): string
+            Where the audio comes from (saved in the transcript store)
+        source_offset (optional): float
+            The offset of the audio in source_name (saved in the transcript store)
+        timeout (optional): float
+            Max seconds for the recognition (None for no limit)
+        deadline (optional): Deadline
+            The budget of the caller (the session one if None)
+        energy_threshold (optional): float
+            The silence energy of audio, to trim it (the recognizer one if None)
         show_debug (optional) : bool
             Show the debug info if it fails?
 
         Returns
         -------
-        status : dict
+        result : Result
             {"status": True/False, "error": error_msg, "value": value}
+            with "timeout": True if the time ran out
         """
+        deadline = self.new_deadline(timeout, deadline)
+        if deadline.expired:
+            return self._timeout_result(show_debug)
+        # a copy: the calls of other threads keep their own budget
+        speech_recognizer = copy.copy(self.recognizer)
+
         # process sentence
+        route = None
         try:
-            # print what I said
-            if recognizer == 'google':
-                sentence = self.recognizer.recognize_google(audio, language=language)
-            elif recognizer == 'bing':
-                sentence = self.recognizer.recognize_bing(audio)
-            elif recognizer == 'google_cloud':
-                sentence = self.recognizer.recognize_google_cloud(audio)
-            elif recognizer == 'houndify':
-                sentence = self.recognizer.recognize_houndify(audio, **kwargs)
-            elif recognizer == 'ibm':
-                sentence = self.recognizer.recognize_ibm(audio)
-            elif recognizer == 'sphinx':
-                sentence = self.recognizer.recognize_sphinx(audio)
-            elif recognizer == 'wit':
-                sentence = self.recognizer.recognize_wit(audio)
-
-            return {"status": True, "error": "", "value": sentence}
+            # identify the language once and send the audio to its backend
+            if language == 'auto':
+                if self.language_router is None:
+                    return self._fail("Set a language_router to use language='auto'", show_debug=show_debug)
+                route = self.language_router.route(audio, backend=recognizer)
+                language, recognizer = route["language"], route["backend"]
+            # send only what the backend uses
+            captured_bytes = len(audio.frame_data)
+            if self.upload_encoder is not None:
+                if energy_threshold is None:
+                    energy_threshold = speech_recognizer.energy_threshold
+                audio = self.upload_encoder.encode(audio, recognizer, energy_threshold=energy_threshold,
+                                                   record=False)
+
+            def attempt(backend):
+                # every API request (retries too) cannot take more than the time left
+                if deadline.expired:
+                    raise DeadlineExceeded("No time left to call {}".format(backend))
+                speech_recognizer.operation_timeout = deadline.remaining(self.recognizer.operation_timeout)
+                return self._recognize(audio, recognizer=backend, language=language,
+                                       speech_recognizer=speech_recognizer,
+                                       **(kwargs if backend == recognizer else {}))
+
+            # the backend that answered (the governor may fall back)
+            backend = recognizer
+            start = time.time()
+            try:
+                if self.governor is None:
+                    sentence, confidence = attempt(recognizer)
+                else:
+                    # rate limit, retry and fall back to offline if the service is down
+                    backend, (sentence, confidence) = self.governor.call(recognizer, attempt,
+                                                                         deadline=deadline,
+                                                                         show_debug=show_debug)
+            finally:
+                latency = time.time() - start
+                if self.upload_encoder is not None:
+                    self.upload_encoder.add_bytes(backend, captured_bytes, len(audio.frame_data))
+                    self.upload_encoder.add_latency(backend, latency)
+
+            # the language heard feeds the session prior
+            if self.language_router is not None:
+                self.language_router.observe(language, routed=route is not None)
+            # save it to search it later
+            self._save_transcript(sentence, source=source_name, offset=source_offset,
+                                  backend=backend, language=language, latency=latency,
+                                  confidence=confidence, show_debug=show_debug)
+            return Result(value=sentence)
+        except IagoError:
+            raise
+        except DeadlineExceeded:
+            return self._timeout_result(show_debug)
         except sr.UnknownValueError:
+            # maybe the wrong language: weaken the prior (identify the next one)
+            if route is not None:
+                self.language_router.observe(None)
             # Cannot understand your sentence
-            if show_debug:
-                warning_print("Warning: Could not understand audio")
-            return {"status": False, "value": None, "error": "Cannot understand audio"}
+            return self._fail(self.CANNOT_UNDERSTAND, show_debug=show_debug, level=WARNING)
         except sr.RequestError as e:
+            if deadline.expired:
+                return self._timeout_result(show_debug)
             # Error with API request
-            if show_debug:
-                error_print("Cannot request results from the API", exception=e)
-            return {"status": False, "value": None, "error": "Cannot request results from the API, because -> {}".format(str(e))}
+            return self._fail("Cannot request results from the API", exception=e, show_debug=show_debug)
+        except Exception as e:
+            if deadline.expired:
+                return self._timeout_result(show_debug)
+            return self._fail("Cannot convert sentence to text (other error)", exception=e, show_debug=show_debug)
+
+    def _save_transcript(self, sentence, show_debug=True, **metadata):
+        # a store problem must not turn a recognized sentence into a failure
+        if self.transcript_store is None:
+            return
+        try:
+            self.transcript_store.add(sentence, **metadata)
         except Exception as e:
             if show_debug:
-                error_print("Cannot convert sentence to text (other error)", exception=e)
-            return {"status": False, "value": None, "error": "Cannot convert sentence to text (other error), because -> {}".format(str(e))}
+                self.logger.warning("Sentence recognized but not saved in the transcript store", exception=e)
+
+    def _spoken_language(self, language):
+        # the language to reply in (the most likely one of the session if 'auto')
+        if language == 'auto' and self.language_router is not None:
+            return self.language_router.current_language()
+        return language
+
+    def _timeout_result(self, show_debug=True):
+        return self._fail("Timeout: no time left to recognize the audio", show_debug=show_debug,
+                          level=WARNING, timeout=True)
+
+    def _fail(self, msg, exception=None, show_debug=True, level=ERROR, timeout=False):
+        # log (free if the level is off) and build the failed result,
+        # the error string is formatted only if somebody reads it
+        if show_debug:
+            self.logger.log(level, msg, exception=exception)
+        if exception is None:
+            result = Result(False, error=msg, timeout=timeout)
+        else:
+            result = Result(False, error=msg.replace("{", "{{").replace("}", "}}") + " because -> {}",
+                            error_args=(exception,), timeout=timeout)
+        if self.raise_errors:
+            raise IagoError(result)
+        return result
+
+    def _recognize(self, audio, recognizer='google', language='en-US', speech_recognizer=None, **kwargs):
+        # call the API/engine (raises the speech_recognition errors),
+        # returns (sentence, confidence) with None if the backend has no confidence
+        if speech_recognizer is None:
+            speech_recognizer = self.recognizer
+        confidence = None
+        if recognizer == 'google':
+            # the raw response has the confidence of the best alternative
+            response = speech_recognizer.recognize_google(audio, language=language, show_all=True)
+            if not isinstance(response, dict) or not response.get("alternative"):
+                raise sr.UnknownValueError()
+            best = max(response["alternative"], key=lambda alternative: alternative.get("confidence", -1))
+            sentence, confidence = best["transcript"], best.get("confidence")
+        elif recognizer == 'bing':
+            sentence = speech_recognizer.recognize_bing(audio)
+        elif recognizer == 'google_cloud':
+            sentence = speech_recognizer.recognize_google_cloud(audio)
+        elif recognizer == 'houndify':
+            sentence = speech_recognizer.recognize_houndify(audio, **kwargs)
+        elif recognizer == 'ibm':
+            sentence = speech_recognizer.recognize_ibm(audio)
+        elif recognizer == 'sphinx':
+            sentence = speech_recognizer.recognize_sphinx(audio)
+        elif recognizer == 'wit':
+            sentence = speech_recognizer.recognize_wit(audio)
+        elif recognizer == 'vosk':
+            sentence, confidence = self.get_streaming_recognizer(language=language, **kwargs).recognize(
+                audio, with_confidence=True)
+            if sentence == "":
+                raise sr.UnknownValueError()
+        else:
+            raise ValueError("Unknown recognizer {}".format(recognizer))
+        return sentence, confidence
 
     def play_sound(self, file_name, show_debug=True):
         """
-        RETURN : {"status": True/False, "error": error_msg },
+        RETURN : Result {"status": True/False, "error": error_msg },
                  play the sound
 
         Parameters
@@ -263,23 +413,22 @@ class Iago():
 
         Returns
         -------
-        status : dict
+        result : Result
             {"status": True/False, "error": error_msg }
         """
         try:
             playsound(file_name)
-            return {"status": False, "error": ""}
+            return Result()
         except Exception as e:
-            if show_debug:
-                error_print("Cannot play the audio, check the format or cannot find it", exception=e)
-            return {"status": False, "error": "Cannot play the audio, check the format or cannot find it, reason -> {}".format(str(e))}
+            return self._fail("Cannot play the audio, check the format or cannot find it", exception=e, show_debug=show_debug)
 
     def audio_to_text(self, file_path,
                       recognizer='google', language='en-US',
                       reduce_noise=True, offset=0,
-                      duration=None, noise_duration=None, show_debug=True):
+                      duration=None, noise_duration=None, speakers=None,
+                      timeout=None, deadline=None, show_debug=True):
         """
-        RETURN : {"status": True/False, "error": error_msg, "value": value},
+        RETURN : Result {"status": True/False, "error": error_msg, "value": value},
                  audio file converted to text
 
         Parameters
@@ -289,51 +438,165 @@ class Iago():
         recognizer (optional): string
             The API/engine to recognize speech
         language (optional): string
-            The language to recognize
+            The language to recognize ('auto' to ask the language_router)
         offset (optional) : float
             Offset for the beginning
         duration (optional) : float
             Duration for recording audio
         noise_duration (optional) : float
             Duration for noise reduce filter
+        speakers (optional) : list
+            Recognize only the turns of these speakers (needs a
+            speaker_segmenter, 0 is who speaks first), the value is then
+            [{"speaker": speaker, "start": seconds, "end": seconds, "text": text}, ...]
+            ('all' for every speaker, None to recognize the whole audio),
+            turns with no words are skipped, any other failure fails the result
+        timeout (optional): float
+            Max seconds for the recognition (None for no limit)
+        deadline (optional): Deadline
+            The budget of the caller (the session one if None)
         show_debug (optional) : bool
             Show the debug info if it fails?
 
         Returns
         -------
-        status : dict
+        result : Result
             {"status": True/False, "error": error_msg, "value": value}
+            with "timeout": True if the time ran out
         """
         # listen the audio
         try:
             try:
                 file = sr.AudioFile(file_path)
             except Exception as e:
-                if show_debug:
-                    error_print("Cannot find the audio file", exception=e)
-                return {"status": False, "value": None, "error": "Cannot find the audio file because -> {}".format(str(e))}
+                return self._fail("Cannot find the audio file", exception=e, show_debug=show_debug)
+            # the noise of this file does not change the mic settings
+            file_recognizer = copy.copy(self.recognizer)
             with file as source:
                 # reduce noise
                 if reduce_noise:
                     if noise_duration is None:
-                        self.recognizer.adjust_for_ambient_noise(source)
+                        file_recognizer.adjust_for_ambient_noise(source)
                     else:
-                        self.recognizer.adjust_for_ambient_noise(source,
+                        file_recognizer.adjust_for_ambient_noise(source,
                                                                  duration=noise_duration)
                 # capture audio
                 if duration is None:
-                    audio = self.recognizer.record(source, offset=offset)
+                    audio = file_recognizer.record(source, offset=offset)
                 else:
-                    audio = self.recognizer.record(source, offset=offset,
+                    audio = file_recognizer.record(source, offset=offset,
                                                    duration=duration)
+                # keep a copy to reprocess it later
+                if self.archive is not None:
+                    self.archive.append(audio, source=file_path, offset=offset)
+                # speech 2 sentence of the wanted speakers only
+                if speakers is not None:
+                    return self._speakers_to_text(audio, speakers, recognizer=recognizer,
+                                                  language=language, source_name=file_path,
+                                                  source_offset=offset, timeout=timeout,
+                                                  deadline=deadline,
+                                                  energy_threshold=file_recognizer.energy_threshold,
+                                                  show_debug=show_debug)
                 # speech 2 sentence
-                text = self.speech_to_text(audio, recognizer=recognizer,
-                                           language=language, show_debug=True)['value']
-                return {"status": False, "value": text, "error": ""}
+                result = self.speech_to_text(audio, recognizer=recognizer,
+                                             language=language, source_name=file_path,
+                                             source_offset=offset, timeout=timeout,
+                                             deadline=deadline,
+                                             energy_threshold=file_recognizer.energy_threshold,
+                                             show_debug=show_debug)
+                return result
+        except IagoError:
+            raise
         except Exception as e:
-            if show_debug:
-                error_print("Cannot parse the audio, check format, only WAV!", exception=e)
-            return {"status": False, "value": None, "error": "Cannot parse the audio, check format, only WAV! reason -> {}".format(str(e))}
+            return self._fail("Cannot parse the audio, check format, only WAV!", exception=e, show_debug=show_debug)
+
+    def _speakers_to_text(self, audio, speakers, recognizer='google', language='en-US',
+                          source_name=None, source_offset=0, timeout=None,
+                          deadline=None, energy_threshold=None, show_debug=True):
+        # segment, then recognize only the turns of speakers (music and silence are dropped)
+        if self.speaker_segmenter is None:
+            return self._fail("Set a speaker_segmenter to select the speakers", show_debug=show_debug)
+        deadline = self.new_deadline(timeout, deadline)
+        try:
+            turns = self.speaker_segmenter.select(audio, speakers=None if speakers == 'all' else speakers)
+        except Exception as e:
+            return self._fail("Cannot split the audio in speaker turns", exception=e, show_debug=show_debug)
+        texts = []
+        for turn, turn_audio in turns:
+            try:
+                result = self.speech_to_text(turn_audio, recognizer=recognizer, language=language,
+                                             source_name=source_name,
+                                             source_offset=(source_offset or 0) + turn["start"],
+                                             deadline=deadline, energy_threshold=energy_threshold,
+                                             show_debug=show_debug)
+            except IagoError as e:
+                if e.result.error != self.CANNOT_UNDERSTAND:
+                    raise
+                result = e.result
+            if result.timeout:
+                return result
+            if result.status:
+                texts.append(dict(turn, text=result.value))
+            elif result.error != self.CANNOT_UNDERSTAND:
+                # a backend problem (key, quota, network) is not an empty turn
+                return self._fail("Cannot recognize the turn of speaker {} at {}s -> {}".format(
+                    turn["speaker"], turn["start"], result.error), show_debug=show_debug)
+            # else: no words in this turn (a cough, a noise), skip it
+        return Result(value=texts)
+
+    def capture(self, sample_rate=48000, chunk_size=2048,
+                reduce_noise=True, noise_duration=None,
+                timeout=None, phrase_time_limit=None,
+                deadline=None, show_debug=True):
+        """
+        RETURN : Result {"status": True/False, "error": error_msg, "value": value},
+                 the audio (not recognized) of one phrase from the mic
+
+        Parameters
+        ----------
+        sample_rate (optioanl): float
+            The sample rate for the mic
+        chunk_size (optional): float
+            The bytes chunk size for the mic
+        reduce_noise (optional) : bool
+            Measure the noise of the room first?
+        noise_duration (optional) : float
+            Duration for noise reduce filter
+        timeout (optional): float
+            Max seconds to wait for the user to start speaking
+        phrase_time_limit (optional): float
+            Max seconds of a phrase
+        deadline (optional): Deadline
+            The budget of the caller (the session one if None)
+        show_debug (optional) : bool
+            Show the debug info if it fails?
+
+        Returns
+        -------
+        result : Result
+            {"status": True/False, "error": error_msg, "value": AudioData}
+            with "timeout": True if nothing was heard in time
+        """
+        turn = self.new_deadline(None, deadline)
+        try:
+            with sr.Microphone(sample_rate=sample_rate, chunk_size=chunk_size) as source:
+                if reduce_noise:
+                    if noise_duration is None:
+                        self.recognizer.adjust_for_ambient_noise(source)
+                    else:
+                        self.recognizer.adjust_for_ambient_noise(source, duration=noise_duration)
+                audio = self._capture(source, turn, timeout=timeout, phrase_time_limit=phrase_time_limit)
+        except sr.WaitTimeoutError:
+            return self._fail("Timeout: nothing heard in time", show_debug=show_debug,
+                              level=WARNING, timeout=True)
+        except IagoError:
+            raise
+        except Exception as e:
+            return self._fail("Cannot connect to the microphone", exception=e, show_debug=show_debug)
+        # keep a copy to reprocess it later
+        if self.archive is not None:
+            self.archive.append(audio, source="mic")
+        return Result(value=audio)
 
     def listen(self, reply="Speak, I'm listening",
                recognizer='google', language='en-US',
@@ -342,7 +605,9 @@ class Iago():
                skip_reply=False,
                reduce_noise=True, noise_duration=None,
                audio_trigger=None, audio_trigger_path="./",
-               show_debug=True):
+               timeout=None, phrase_time_limit=None,
+               recognition_timeout=None, turn_timeout=None,
+               deadline=None, show_debug=True):
         """
         RETURN : the sentence (string) of the user
 
@@ -353,7 +618,7 @@ class Iago():
         recognizer (optional): string
             The API/engine to recognize speech
         language (optional): string
-            The language to recognize
+            The language to recognize ('auto' to ask the language_router)
         sample_rate (optioanl): float
             The sample rate for the mic
         chunk_size (optional): float
@@ -372,6 +637,19 @@ class Iago():
             Use an audio to trigger listening?
         audio_trigger_path (optioanl): string
             The audio path to the wav file trigger audio
+        timeout (optional): float
+            Max seconds to wait for the user to start speaking
+        phrase_time_limit (optional): float
+            Max seconds of a phrase
+        recognition_timeout (optional): float
+            Max seconds to recognize each phrase
+        turn_timeout (optional): float
+            Max seconds for the whole turn (all the stages)
+        deadline (optional): Deadline
+            The budget of the caller (the session one if None),
+            cancel it to stop listening (seen within half a second
+            while waiting for a phrase, a phrase already started ends
+            at phrase_time_limit)
         show_debug (optional) : bool
             Show the debug info if it fails?
 
@@ -380,7 +658,11 @@ class Iago():
         sentence : string
             The sentence of the user
             or None if error
+            or TIMED_OUT if the time ran out
         """
+        # the budget of this turn
+        turn = self.new_deadline(turn_timeout, deadline)
+
         # load saved data
         if trigger_string is None:
             trigger_string = self.trigger_string
@@ -388,13 +670,13 @@ class Iago():
             stop_string = self.stop_string
 
         if not skip_reply:
-            if language == 'it-IT':
+            if self._spoken_language(language) == 'it-IT':
                 reply = "Parla pure, ti ascolto!"
 
             # reply
             self.say(reply, show_debug=False)
-            info_print(reply)
-            info_print("...")
+            self.logger.info(reply)
+            self.logger.info("...")
 
         # listen the user
         try:
@@ -410,17 +692,34 @@ class Iago():
                             self.recognizer.adjust_for_ambient_noise(source,
                                                                      duration=noise_duration)
                 while(trigger_string not in sentence.lower()):
-                    # capture audio
-                    audio = self.recognizer.listen(source)
+                    if turn.expired:
+                        return self._listen_timeout(show_debug)
+                    # capture audio (never wait or record past the turn)
+                    try:
+                        audio = self._capture(source, turn, timeout=timeout,
+                                              phrase_time_limit=phrase_time_limit)
+                    except sr.WaitTimeoutError:
+                        return self._listen_timeout(show_debug)
+                    # keep a copy to reprocess it later
+                    if self.archive is not None:
+                        self.archive.append(audio, source="mic")
                     # speech 2 sentence
-                    result_sentence = self.speech_to_text(audio, recognizer=recognizer,
-                                                          language=language, show_debug=True)
-                    sentence = result_sentence['value']
-                    info_print("Sentence: \"{}\"".format(sentence))
+                    try:
+                        result_sentence = self.speech_to_text(audio, recognizer=recognizer,
+                                                              language=language, source_name="mic",
+                                                              timeout=recognition_timeout, deadline=turn,
+                                                              show_debug=show_debug)
+                    except IagoError as e:
+                        # not understood is part of the conversation, not an error
+                        result_sentence = e.result
+                    if result_sentence.timeout:
+                        return self._listen_timeout(show_debug)
+                    sentence = result_sentence.value
+                    self.logger.debug("Sentence: \"{}\"", sentence)
                     if sentence is None:
                         # I didnt understand
                         cannot_understand = "Sorry, I didn't get that"
-                        info_print(cannot_understand)
+                        self.logger.info(cannot_understand)
 
                         sentence = ""
                         # play go sound
@@ -429,30 +728,241 @@ class Iago():
                     if stop_string in sentence.lower():
                         # Ok no problem bye
                         byebye = "Ok, no problem, bye bye!"
-                        info_print(byebye)
-                        self.say(byebye, show_debug=True)
+                        self.logger.info(byebye)
+                        self.say(byebye, show_debug=show_debug)
                         return None
 
                 if sentence is None:
                     # I didnt understand
                     cannot_understand = "Sorry, I didn't get that"
-                    info_print(cannot_understand)
-                    if language == 'it-IT':
+                    self.logger.info(cannot_understand)
+                    if self._spoken_language(language) == 'it-IT':
                         cannot_understand = "Non ho capito bene"
-                    self.say(cannot_understand)
+                    self.say(cannot_understand, show_debug=show_debug)
                     sentence = ""
                     # play go sound
                     if audio_trigger is not None:
                         self.play_sound(audio_trigger_path + audio_trigger)
 
                 return sentence.lower()
+        except IagoError:
+            raise
         except Exception as e:
-            error_print("Error: Cannot connect to the microphone", exception=e)
+            self._fail("Cannot connect to the microphone", exception=e, show_debug=show_debug)
             return None
 
+    def listen_stream(self, reply="Speak, I'm listening",
+                      language='en-US',
+                      trigger_string=None, stop_string=None,
+                      sample_rate=16000, chunk_size=4000,
+                      on_result=None, model_path=None,
+                      skip_reply=False,
+                      audio_trigger=None, audio_trigger_path="./",
+                      turn_timeout=None, deadline=None, show_debug=True):
+        """
+        RETURN : the sentence (string) of the user,
+                 recognized incrementally while the user speaks
+
+        The mic frames are fed to an offline streaming decoder (vosk),
+        interim hypotheses are sent to on_result while the audio is
+        still arriving and the stop string cancels on the first
+        partial that contains it
+
+        Parameters
+        ----------
+        reply (optional): string
+            The reply when listening is triggered
+        language (optional): string
+            The language to recognize
+        trigger_string (optional): string
+            The trigger string to activate ok python bot
+        stop_string (optional): string
+            The trigger string to stop Iago
+        sample_rate (optioanl): float
+            The sample rate for the mic
+        chunk_size (optional): float
+            The bytes chunk size for the mic
+        on_result (optional): function
+            Called with {"text": text, "stable": True/False, "confidence": conf}
+            for every partial (stable False) and final (stable True) result
+        model_path (optional): string
+            The path to a vosk model (if None picked by language)
+        skip_reply (optional): bool
+            Skip the reply part?
+        audio_trigger (optional): bool
+            Use an audio to trigger listening?
+        audio_trigger_path (optioanl): string
+            The audio path to the wav file trigger audio
+        turn_timeout (optional): float
+            Max seconds for the whole turn
+        deadline (optional): Deadline
+            The budget of the caller (the session one if None),
+            cancel it to stop listening
+        show_debug (optional) : bool
+            Show the debug info if it fails?
+
+        Returns
+        -------
+        sentence : string
+            The sentence of the user
+            or None if error
+            or TIMED_OUT if the time ran out
+        """
+        # the budget of this turn
+        turn = self.new_deadline(turn_timeout, deadline)
+
+        # load saved data
+        if trigger_string is None:
+            trigger_string = self.trigger_string
+        if stop_string is None:
+            stop_string = self.stop_string
+
+        if not skip_reply:
+            if language == 'it-IT':
+                reply = "Parla pure, ti ascolto!"
+
+            # reply
+            self.say(reply, show_debug=False)
+            self.logger.info(reply)
+            self.logger.info("...")
+
+        # streaming decoder (its own: the cached one is shared with speech_to_text,
+        # only the loaded model is reused)
+        try:
+            shared = self.get_streaming_recognizer(language=language, sample_rate=sample_rate,
+                                                   model_path=model_path, show_debug=show_debug)
+            decoder = StreamingRecognizer(model_path=model_path, language=language,
+                                          sample_rate=sample_rate, model=shared.model,
+                                          show_debug=show_debug)
+        except Exception as e:
+            self._fail("Cannot load the streaming recognizer", exception=e, show_debug=show_debug)
+            return None
+        if on_result is not None:
+            decoder.subscribe(on_result)
+
+        # listen the user
+        try:
+            with sr.Microphone(sample_rate=sample_rate, chunk_size=chunk_size) as source:
+                # play go sound
+                if audio_trigger is not None:
+                    self.play_sound(audio_trigger_path + audio_trigger)
+                decoder.reset()
+                while True:
+                    if turn.expired:
+                        return self._listen_timeout(show_debug)
+                    # feed the decoder frame by frame
+                    result = decoder.feed(source.stream.read(source.CHUNK))
+                    if result is None:
+                        continue
+                    sentence = result["text"].lower()
+                    # act early: a partial is enough to stop
+                    if stop_string in sentence:
+                        byebye = "Ok, no problem, bye bye!"
+                        self.logger.info(byebye)
+                        self.say(byebye, show_debug=show_debug)
+                        return None
+                    if result["stable"]:
+                        self.logger.debug("Sentence: \"{}\"", sentence)
+                        if trigger_string in sentence:
+                            return sentence
+        except IagoError:
+            raise
+        except Exception as e:
+            self._fail("Cannot connect to the microphone", exception=e, show_debug=show_debug)
+            return None
+        finally:
+            if on_result is not None:
+                decoder.unsubscribe(on_result)
+
+    def get_streaming_recognizer(self, language='en-US', sample_rate=16000,
+                                 model_path=None, show_debug=True):
+        """
+        RETURN : a StreamingRecognizer (cached by language, rate and model)
+
+        Parameters
+        ----------
+        language (optional): string
+            The language to recognize
+        sample_rate (optional): int
+            The sample rate of the frames
+        model_path (optional): string
+            The path to a vosk model (if None picked by language)
+        show_debug (optional) : bool
+            Show the debug info if it fails?
+
+        Returns
+        -------
+        recognizer : StreamingRecognizer
+            The streaming decoder
+        """
+        key = (language, sample_rate, model_path)
+        if key not in self.streaming_recognizers:
+            self.streaming_recognizers[key] = StreamingRecognizer(model_path=model_path,
+                                                                  language=language,
+                                                                  sample_rate=sample_rate,
+                                                                  show_debug=show_debug)
+        return self.streaming_recognizers[key]
+
+    def _capture(self, source, turn, timeout=None, phrase_time_limit=None, poll=0.5):
+        # wait for a phrase in short slices: a blocking listen would not see cancel()
+        wait = Deadline(timeout, parents=(turn,))
+        while True:
+            # read once: speech_recognition takes 0 for "no limit"
+            slice_timeout = wait.remaining(poll)
+            phrase_limit = turn.remaining(phrase_time_limit)
+            if slice_timeout <= 0 or (phrase_limit is not None and phrase_limit <= 0):
+                raise sr.WaitTimeoutError("No phrase before the timeout")
+            try:
+                return self.recognizer.listen(source, timeout=slice_timeout,
+                                              phrase_time_limit=phrase_limit)
+            except sr.WaitTimeoutError:
+                continue
+
+    def _listen_timeout(self, show_debug=True):
+        if show_debug:
+            self.logger.info("Timeout: no more time to listen")
+        return TIMED_OUT
+
+    def start_session(self, timeout=None):
+        """
+        RETURN : Deadline, the budget of the session
+                 (every call made until end_session stays inside it)
+
+        Parameters
+        ----------
+        timeout (optional): float
+            Max seconds for the session (None for no limit)
+        """
+        self.session_deadline = Deadline(timeout)
+        return self.session_deadline
+
+    def end_session(self):
+        """
+        RETURN : None, cancel the session (calls in progress time out)
+        """
+        if self.session_deadline is not None:
+            self.session_deadline.cancel()
+        self.session_deadline = None
+
+    def new_deadline(self, timeout=None, deadline=None):
+        """
+        RETURN : Deadline, timeout seconds inside deadline
+                 (or inside the session if deadline is None)
+
+        Parameters
+        ----------
+        timeout (optional): float
+            Max seconds (None for no limit of its own)
+        deadline (optional): Deadline
+            The parent budget
+        """
+        if deadline is None:
+            deadline = self.session_deadline
+        return Deadline(timeout, parents=(deadline,))
+
     def mute(self, show_debug=True):
         """
-        RETURN : {"status": True/False, "error": error_msg },
+        RETURN : Result {"status": True/False, "error": error_msg },
                  mute
 
         Parameters
@@ -462,24 +972,22 @@ class Iago():
 
         Returns
         -------
-        status : dict
+        result : Result
             {"status": True/False, "error": error_msg }
         """
         try:
             self.engine.setProperty('volume', 0)
             self.volume = 0
-            return {"status": True, "error": ""}
+            return Result()
         except Exception as e:
-            if show_debug:
-                error_print("Cannot mute volume", exception=e)
-            return {"status": False, "error": "Cannot mute volume because {}".format(str(e))}
+            return self._fail("Cannot mute volume", exception=e, show_debug=show_debug)
 
     def set_mic(self, show_debug=True):
         pass
 
     def set_volume(self, volume, show_debug=True):
         """
-        RETURN : {"status": True/False, "error": error_msg },
+        RETURN : Result {"status": True/False, "error": error_msg },
                  set volume
 
         Parameters
@@ -491,25 +999,21 @@ class Iago():
 
         Returns
         -------
-        status : dict
+        result : Result
             {"status": True/False, "error": error_msg }
         """
         if volume < 0 or volume > 1:
-            if show_debug:
-                error_print("Please insert a valid volume [from 0.0 to 1.0]")
-            return {"status": False, "error": "Please insert a valid volume [from 0.0 to 1.0]"}
+            return self._fail("Please insert a valid volume [from 0.0 to 1.0]", show_debug=show_debug)
         try:
             self.engine.setProperty("volume", volume)  # Volume 0-1
             self.volume = volume
-            return {"status": True, "error": ""}
+            return Result()
         except Exception as e:
-            if show_debug:
-                error_print("Cannot set volume because -> {}".format(str(e)))
-            return {"status": False, "error": "Cannot set volume because -> {}".format(str(e))}
+            return self._fail("Cannot set volume", exception=e, show_debug=show_debug)
 
     def set_voice_speed(self, voice_speed, show_debug=True):
         """
-        RETURN : {"status": True/False, "error": error_msg },
+        RETURN : Result {"status": True/False, "error": error_msg },
                  set volume
 
         Parameters
@@ -521,26 +1025,22 @@ class Iago():
 
         Returns
         -------
-        status : dict
+        result : Result
             {"status": True/False, "error": error_msg }
         """
         # parameter validation
         if voice_speed <= 0:
-            if show_debug:
-                error_print("Please insert a valid speed [> 0]")
-            return {"status": False, "error": "Please insert a valid speed [> 0]"}
+            return self._fail("Please insert a valid speed [> 0]", show_debug=show_debug)
         try:
             self.engine.setProperty('rate', voice_speed)
             self.voice_speed = voice_speed
-            return {"status": True, "error": ""}
+            return Result()
         except Exception as e:
-            if show_debug:
-                error_print("Cannot set voice speed, because -> {}".format(str(e)))
-            return {"status": False, "error": "Cannot set voice speed, because -> {}".format(str(e))}
+            return self._fail("Cannot set voice speed", exception=e, show_debug=show_debug)
 
     def set_voice_by_id(self, voice_id, show_debug=True):
         """
-        RETURN : {"status": True/False, "error": error_msg },
+        RETURN : Result {"status": True/False, "error": error_msg },
                  set volume
 
         Parameters
@@ -552,7 +1052,7 @@ class Iago():
 
         Returns
         -------
-        status : dict
+        result : Result
             {"status": True/False, "error": error_msg }
         """
         try:
@@ -561,15 +1061,13 @@ class Iago():
             for voice in voices:
                 if voice.id == voice_id:
                     self.voice_name = voice.name
-            return {"status": True, "error": ""}
+            return Result()
         except Exception as e:
-            if show_debug:
-                error_print("Cannot find a voice with that ID", exception=e)
-            return {"status": False, "error": "Cannot find a voice with that ID because -> {}".format(str(e))}
+            return self._fail("Cannot find a voice with that ID", exception=e, show_debug=show_debug)
 
     def set_voice(self, voice_name, show_debug=True):
         """
-        RETURN : {"status": True/False, "error": error_msg },
+        RETURN : Result {"status": True/False, "error": error_msg },
                  set volume
 
         Parameters
@@ -581,7 +1079,7 @@ class Iago():
 
         Returns
         -------
-        status : dict
+        result : Result
             {"status": True/False, "error": error_msg }
         """
         try:
@@ -591,21 +1089,17 @@ class Iago():
                 if voice.name == voice_name:
                     voice_id = voice.id
             if voice_id == "":
-                if show_debug:
-                    error_print("Cannot find a voice with this name")
-                return {"status": False, "error": "Cannot find a voice with this name"}
+                return self._fail("Cannot find a voice with this name", show_debug=show_debug)
             else:
                 self.engine.setProperty('voice', voice_id)
                 self.voice_name = voice_name
-                return {"status": True, "error": ""}
+                return Result()
         except Exception as e:
-            if show_debug:
-                error_print("Cannot change ok python voice", exception=e)
-            return {"status": False, "error": "Cannot change ok python voice because -> {}".format(str(e))}
+            return self._fail("Cannot change ok python voice", exception=e, show_debug=show_debug)
 
     def set_trigger_string(self, trigger_string, show_debug=True):
         """
-        RETURN : {"status": True/False, "error": error_msg },
+        RETURN : Result {"status": True/False, "error": error_msg },
                  set trigger string
 
         Parameters
@@ -617,20 +1111,18 @@ class Iago():
 
         Returns
         -------
-        status : dict
+        result : Result
             {"status": True/False, "error": error_msg }
         """
         try:
             self.trigger_string = trigger_string
-            return {"status": True, "error": ""}
+            return Result()
         except Exception as e:
-            if show_debug:
-                error_print("Cannot set trigger string", exception=e)
-            return {"status": False, "error": "Cannot set trigger string because -> {}".format(str(e))}
+            return self._fail("Cannot set trigger string", exception=e, show_debug=show_debug)
 
     def set_stop_string(self, stop_string, show_debug=True):
         """
-        RETURN : {"status": True/False, "error": error_msg },
+        RETURN : Result {"status": True/False, "error": error_msg },
                  set stop string
 
         Parameters
@@ -642,20 +1134,18 @@ class Iago():
 
         Returns
         -------
-        status : dict
+        result : Result
             {"status": True/False, "error": error_msg }
         """
         try:
             self.stop_string = stop_string
-            return {"status": True, "error": ""}
+            return Result()
         except Exception as e:
-            if show_debug:
-                error_print("Cannot set stop string", exception=e)
-            return {"status": False, "error": "Cannot set stop string because -> {}".format(str(e))}
+            return self._fail("Cannot set stop string", exception=e, show_debug=show_debug)
 
     def get_mics(self, show_debug=True):
         """
-        RETURN : {"status": True/False, "error": error_msg },
+        RETURN : Result {"status": True/False, "error": error_msg, "value": value},
                  get mics
 
         Parameters
@@ -665,22 +1155,21 @@ class Iago():
 
         Returns
         -------
-        status : dict
-            {"status": True/False, "error": error_msg }
+        result : Result
+            {"status": True/False, "error": error_msg, "value": value}
         """
         # find working mics
         try:
-            info_print(sr.Microphone.list_working_microphones())
-            return {"status": True, "error": ""}
+            mics = sr.Microphone.list_working_microphones()
+            self.logger.info("{}", mics)
+            return Result(value=mics)
         except Exception as e:
-            if show_debug:
-                error_print("Cannot print all mics", exception=e)
-            return {"status": False, "error": "Cannot print all mics because -> {}".format(str(e))}
+            return self._fail("Cannot print all mics", exception=e, show_debug=show_debug)
 
     def get_voices(self, show_names_only=False, show_debug=True):
         """
-        RETURN : {"status": True/False, "error": error_msg },
-                 get mics
+        RETURN : Result {"status": True/False, "error": error_msg, "value": value},
+                 get voices
 
         Parameters
         ----------
@@ -691,33 +1180,27 @@ class Iago():
 
         Returns
         -------
-        status : dict
-            {"status": True/False, "error": error_msg }
+        result : Result
+            {"status": True/False, "error": error_msg, "value": value}
         """
         try:
             voices = self.engine.getProperty('voices')
             for voice in voices:
                 if show_names_only:
-                    print(" Name: %s" % voice.name)
+                    self.logger.info(" Name: {}", voice.name)
                 else:
-                    print("Voice:")
-                    print(" - ID: %s" % voice.id)
-                    print(" - Name: %s" % voice.name)
-                    print(" - Languages: %s" % voice.languages)
-                    print(" - Gender: %s" % voice.gender)
-                    print(" - Age: %s" % voice.age)
-            return {"status": True, "error": ""}
+                    self.logger.info("Voice:\n - ID: {}\n - Name: {}\n - Languages: {}\n - Gender: {}\n - Age: {}",
+                                     voice.id, voice.name, voice.languages, voice.gender, voice.age)
+            return Result(value=voices)
         except Exception as e:
-            if show_debug:
-                error_print("Cannot print voices list", exception=e)
-            return {"status": False, "error": "Cannot print voices list because -> {}".format(str(e))}
+            return self._fail("Cannot print voices list", exception=e, show_debug=show_debug)
 
     def get_mic(self, show_debug=True):
         pass
 
     def get_volume(self, show_debug=True):
         """
-        RETURN : {"status": True/False, "error": error_msg, "value": value},
+        RETURN : Result {"status": True/False, "error": error_msg, "value": value},
                  get volume
 
         Parameters
@@ -727,20 +1210,18 @@ class Iago():
 
         Returns
         -------
-        status : dict
+        result : Result
             {"status": True/False, "error": error_msg, "value": value}
         """
         try:
             volume = self.volume
-            return {"status": True, "error": "", "value": volume}
+            return Result(value=volume)
         except Exception as e:
-            if show_debug:
-                error_print("Cannot get volume", exception=e)
-            return {"status": False, "error": "Cannot get volume because -> {}".format(str(e)), "value": None}
+            return self._fail("Cannot get volume", exception=e, show_debug=show_debug)
 
     def get_voice_speed(self, show_debug=True):
         """
-        RETURN : {"status": True/False, "error": error_msg, "value": value},
+        RETURN : Result {"status": True/False, "error": error_msg, "value": value},
                  get voice speed
 
         Parameters
@@ -750,20 +1231,18 @@ class Iago():
 
         Returns
         -------
-        status : dict
+        result : Result
             {"status": True/False, "error": error_msg, "value": value}
         """
         try:
             voice_speed = self.voice_speed
-            return {"status": True, "error": "", "value": voice_speed}
+            return Result(value=voice_speed)
         except Exception as e:
-            if show_debug:
-                error_print("Cannot get voice_speed", exception=e)
-            return {"status": False, "error": "Cannot get voice_speed because -> {}".format(str(e)), "value": None}
+            return self._fail("Cannot get voice_speed", exception=e, show_debug=show_debug)
 
     def get_voice(self, show_debug=True):
         """
-        RETURN : {"status": True/False, "error": error_msg, "value": value},
+        RETURN : Result {"status": True/False, "error": error_msg, "value": value},
                  get voice name
 
         Parameters
@@ -773,20 +1252,18 @@ class Iago():
 
         Returns
         -------
-        status : dict
+        result : Result
             {"status": True/False, "error": error_msg, "value": value}
         """
         try:
             voice_name = self.voice_name
-            return {"status": True, "error": "", "value": voice_name}
+            return Result(value=voice_name)
         except Exception as e:
-            if show_debug:
-                error_print("Cannot get voice_speed", exception=e)
-            return {"status": False, "error": "Cannot get voice_speed because -> {}".format(str(e)), "value": None}
+            return self._fail("Cannot get voice_speed", exception=e, show_debug=show_debug)
 
     def get_trigger_string(self, show_debug=True):
         """
-        RETURN : {"status": True/False, "error": error_msg, "value": value},
+        RETURN : Result {"status": True/False, "error": error_msg, "value": value},
                  get trigger string
 
         Parameters
@@ -796,20 +1273,18 @@ class Iago():
 
         Returns
         -------
-        status : dict
+        result : Result
             {"status": True/False, "error": error_msg, "value": value}
         """
         try:
             trigger_string = self.trigger_string
-            return {"status": True, "error": "", "value": trigger_string}
+            return Result(value=trigger_string)
         except Exception as e:
-            if show_debug:
-                error_print("Cannot get trigger_string", exception=e)
-            return {"status": False, "error": "Cannot get trigger_string because -> {}".format(str(e)), "value": None}
+            return self._fail("Cannot get trigger_string", exception=e, show_debug=show_debug)
 
     def get_stop_string(self, show_debug=True):
         """
-        RETURN : {"status": True/False, "error": error_msg, "value": value},
+        RETURN : Result {"status": True/False, "error": error_msg, "value": value},
                  get stop string
 
         Parameters
@@ -819,14 +1294,12 @@ class Iago():
 
         Returns
         -------
-        status : dict
+        result : Result
             {"status": True/False, "error": error_msg, "value": value}
         """
         try:
             stop_string = self.stop_string
-            return {"status": True, "error": "", "value": stop_string}
+            return Result(value=stop_string)
         except Exception as e:
-            if show_debug:
-                error_print("Cannot get stop_string", exception=e)
-            return {"status": False, "error": "Cannot get stop_string because -> {}".format(str(e)), "value": None}
+            return self._fail("Cannot get stop_string", exception=e, show_debug=show_debug)
 # + + + + + Classes + + + + +
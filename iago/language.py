@@ -0,0 +1,263 @@
+"""
+language
+--------
+This script contains
+the VoskLanguageIdentifier and LanguageRouter classes
+(recognize each utterance once, in the right language)
+
+Date: 2026-10-19
+
+Author: Lorenzo Coacci
+"""
+# + + + + + Libraries + + + + +
+# to share the session between threads
+import threading
+# to manage incremental (streaming) speech 2 text
+from .streaming import StreamingRecognizer
+# + + + + + Libraries + + + + +
+
+
+# + + + + + Classes + + + + +
+class VoskLanguageIdentifier():
+    """
+    VoskLanguageIdentifier : local spoken language identification
+
+    Decodes only the first seconds of the audio with a small offline
+    model for each language and scores every language by the mean
+    word confidence of its decoder
+
+    It is not a real language ID model: every call is one local
+    recognition of sample_seconds per candidate language (the router
+    calls it only while the session prior is not confident), and the
+    word confidences of different models are not calibrated against
+    each other, so the scores are a heuristic. Pass a real language ID
+    model as the router identifier if accuracy or CPU matter more than
+    having no extra dependency (decoded_seconds measures the cost)
+
+    Parameters
+    ----------
+    model_paths (optional): dict
+        {language: vosk model path} (the model is picked by language
+        if a path is None or missing)
+    sample_seconds (optional): float
+        Seconds of audio to decode
+    sample_rate (optional): int
+        The rate of the decoders
+
+    Attributes
+    ----------
+    decoded_seconds : float
+        Seconds of audio decoded so far (all languages)
+
+    Methods
+    -------
+    __call__(audio, languages)
+        {language: probability}
+    """
+    def __init__(self, model_paths=None, sample_seconds=3.0, sample_rate=16000):
+        self.model_paths = model_paths if model_paths is not None else {}
+        self.sample_seconds = sample_seconds
+        self.sample_rate = sample_rate
+        self.recognizers = {}
+        self.decoded_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def __call__(self, audio, languages):
+        raw = audio.get_raw_data(convert_rate=self.sample_rate, convert_width=2)
+        raw = raw[:int(self.sample_rate * 2 * self.sample_seconds)]
+        scores = {}
+        # the decoders are shared, one utterance at a time
+        with self._lock:
+            for language in languages:
+                scores[language] = self._score(self._recognizer(language), raw)
+            self.decoded_seconds += len(languages) * len(raw) / (2.0 * self.sample_rate)
+        total = sum(scores.values())
+        if total == 0:
+            return {language: 1.0 / len(languages) for language in languages}
+        return {language: score / total for language, score in scores.items()}
+
+    def _recognizer(self, language):
+        if language not in self.recognizers:
+            self.recognizers[language] = StreamingRecognizer(model_path=self.model_paths.get(language),
+                                                             language=language,
+                                                             sample_rate=self.sample_rate,
+                                                             show_debug=False)
+        return self.recognizers[language]
+
+    def _score(self, recognizer, raw):
+        recognizer.reset()
+        confidences = []
+        step = self.sample_rate // 2
+        for i in range(0, len(raw), step):
+            result = recognizer.feed(raw[i:i + step])
+            if result is not None and result["stable"] and result["confidence"] is not None:
+                confidences.append(result["confidence"])
+        result = recognizer.finish()
+        if result["confidence"] is not None:
+            confidences.append(result["confidence"])
+        if not confidences:
+            return 0.0
+        return sum(confidences) / len(confidences)
+
+
+class LanguageRouter():
+    """
+    LanguageRouter : pick the language (and backend) of an utterance
+
+    Keeps a per-session prior of the languages heard, when the prior
+    is confident enough the identification is skipped, otherwise the
+    identifier scores are combined with the prior. Every utterance is
+    then recognized once instead of once per language
+
+    There is no default identifier: pick a real language ID model if you
+    have one, VoskLanguageIdentifier (no extra dependency) decodes the
+    audio once per candidate language, so use it with few languages
+
+    Parameters
+    ----------
+    identifier : function
+        identifier(audio, languages) -> {language: probability}
+        (ex: a VoskLanguageIdentifier)
+    languages (optional): list
+        The candidate languages (ex: ["en-US", "it-IT"])
+    backends (optional): dict
+        {language: recognizer} to route each language to a backend
+        (None to keep the recognizer asked by the caller)
+    prior_threshold (optional): float
+        Skip identification if a language has at least this prior
+    min_observations (optional): int
+        Recognized utterances to see before trusting the prior
+    decay (optional): float
+        How much the older utterances count (0-1, 1 = never forget)
+
+    Methods
+    -------
+    route(audio)
+        {"language", "backend", "confidence", "identified"}
+    observe(language, routed=False)
+        Update the session prior with a recognized utterance
+    feedback(routed_language, true_language)
+        Measure the routing accuracy
+    stats()
+        Utterances, identifications, calls saved and accuracy
+    """
+    def __init__(self, identifier, languages=("en-US", "it-IT"), backends=None,
+                 prior_threshold=0.8, min_observations=3, decay=0.9):
+        self.languages = list(languages)
+        self.identifier = identifier
+        self.backends = backends if backends is not None else {}
+        self.prior_threshold = prior_threshold
+        self.min_observations = min_observations
+        self.decay = decay
+        self._lock = threading.Lock()
+        self.counters = {"utterances": 0, "identifications": 0, "skipped": 0,
+                         "recognized": 0, "feedbacks": 0, "correct": 0}
+        self.reset_session()
+
+    def reset_session(self):
+        """
+        RETURN : None, forget the languages heard in the session
+        """
+        with self._lock:
+            self.weights = {language: 0.0 for language in self.languages}
+            self.observations = 0
+
+    def prior(self):
+        """
+        RETURN : dict, {language: probability} of the session
+        """
+        with self._lock:
+            total = sum(self.weights.values())
+            n = len(self.languages)
+            return {language: (weight + 1.0) / (total + n) for language, weight in self.weights.items()}
+
+    def current_language(self):
+        """
+        RETURN : string, the most likely language of the session
+        """
+        prior = self.prior()
+        return max(prior, key=prior.get)
+
+    def route(self, audio, backend=None):
+        """
+        RETURN : {"language": language, "backend": backend,
+                  "confidence": probability, "identified": True/False}
+
+        Parameters
+        ----------
+        audio : AudioData
+            The utterance
+        backend (optional): string
+            The recognizer to use if the language has no backend
+
+        Returns
+        -------
+        route : dict
+            Where to send the utterance
+        """
+        prior = self.prior()
+        best = max(prior, key=prior.get)
+        identified = False
+        if self.observations < self.min_observations or prior[best] < self.prior_threshold:
+            # not sure: ask the identifier (prior x likelihood)
+            scores = self.identifier(audio, self.languages)
+            posterior = {language: prior[language] * scores.get(language, 0.0) for language in self.languages}
+            total = sum(posterior.values())
+            if total > 0:
+                prior = {language: score / total for language, score in posterior.items()}
+                best = max(prior, key=prior.get)
+            identified = True
+        with self._lock:
+            self.counters["utterances"] += 1
+            self.counters["identifications" if identified else "skipped"] += 1
+        return {"language": best, "backend": self.backends.get(best, backend),
+                "confidence": prior[best], "identified": identified}
+
+    def observe(self, language, routed=False):
+        """
+        RETURN : None, language was heard (updates the session prior),
+                 pass None if nothing was understood (the prior only fades)
+
+        Parameters
+        ----------
+        language : string
+            The language recognized (None if nothing was understood)
+        routed (optional): bool
+            Was the language picked by route? (counted in calls_saved)
+        """
+        # a miss halves the prior (the speaker may have switched language)
+        fade = self.decay if language is not None else 0.5
+        with self._lock:
+            for key in self.weights:
+                self.weights[key] *= fade
+            if language in self.weights:
+                self.weights[language] += 1.0
+                # a miss is no evidence of the session language
+                self.observations += 1
+                if routed:
+                    self.counters["recognized"] += 1
+
+    def feedback(self, routed_language, true_language):
+        """
+        RETURN : None, record if the routing was right
+        """
+        with self._lock:
+            self.counters["feedbacks"] += 1
+            if routed_language == true_language:
+                self.counters["correct"] += 1
+
+    def stats(self):
+        """
+        RETURN : dict, utterances, identifications, skipped, recognized,
+                 calls_saved and accuracy
+
+        calls_saved are the recognitions avoided vs one per language, only
+        for the routed utterances recognized in one pass (a miss saved
+        nothing), the cost of the identifier itself is in identifications
+        """
+        with self._lock:
+            stats = dict(self.counters)
+        stats["calls_saved"] = stats["recognized"] * (len(self.languages) - 1)
+        stats["accuracy"] = stats["correct"] / stats["feedbacks"] if stats["feedbacks"] else None
+        return stats
+# + + + + + Classes + + + + +
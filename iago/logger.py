@@ -0,0 +1,100 @@
+"""
+logger
+------
+This script contains
+the Logger class and the iago logger
+(leveled golog prints, formatted only when shown)
+
+Date: 2026-10-19
+
+Author: Lorenzo Coacci
+"""
+# + + + + + Libraries + + + + +
+# for log funcs
+from golog import error_print, warning_print, info_print
+# + + + + + Libraries + + + + +
+
+# what "from .logger import *" gives the package (iago.logger stays this module)
+__all__ = ["Logger", "DEBUG", "INFO", "WARNING", "ERROR", "SILENT", "iago_logger"]
+
+
+# + + + + + Levels + + + + +
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+SILENT = 100
+# + + + + + Levels + + + + +
+
+
+# + + + + + Classes + + + + +
+class Logger():
+    """
+    Logger : golog prints with a level
+
+    A message under the level costs one comparison: it is not
+    formatted and nothing is printed. Pass the arguments instead of
+    formatting the message yourself (ex: logger.debug("Sentence: {}", s))
+
+    Parameters
+    ----------
+    level (optional): int
+        DEBUG, INFO, WARNING, ERROR or SILENT
+
+    Methods
+    -------
+    debug(msg, *args), info(msg, *args), warning(msg, *args), error(msg, *args)
+        Print msg.format(*args) if the level is enabled
+    """
+    __slots__ = ("level",)
+
+    def __init__(self, level=INFO):
+        self.level = level
+
+    def set_level(self, level):
+        """
+        RETURN : None, show only the messages of level or more
+        """
+        self.level = level
+
+    def enabled(self, level):
+        """
+        RETURN : bool, is level shown?
+        """
+        return level >= self.level
+
+    def debug(self, msg, *args, exception=None):
+        if DEBUG >= self.level:
+            info_print(msg.format(*args) if args else msg, info_label="DEBUG : ", exception=exception)
+
+    def info(self, msg, *args, exception=None):
+        if INFO >= self.level:
+            info_print(msg.format(*args) if args else msg, exception=exception)
+
+    def warning(self, msg, *args, exception=None):
+        if WARNING >= self.level:
+            warning_print(msg.format(*args) if args else msg, exception=exception)
+
+    def error(self, msg, *args, exception=None):
+        if ERROR >= self.level:
+            error_print(msg.format(*args) if args else msg, exception=exception)
+
+    def log(self, level, msg, *args, exception=None):
+        """
+        RETURN : None, print msg with the function of level
+        """
+        if level < self.level:
+            return
+        if level >= ERROR:
+            self.error(msg, *args, exception=exception)
+        elif level >= WARNING:
+            self.warning(msg, *args, exception=exception)
+        elif level >= INFO:
+            self.info(msg, *args, exception=exception)
+        else:
+            self.debug(msg, *args, exception=exception)
+
+
+# the logger of the whole package
+iago_logger = Logger()
+# + + + + + Classes + + + + +
@@ -0,0 +1,102 @@
+"""
+results
+-------
+This script contains
+the Result class and the IagoError exception
+(what every Iago method returns)
+
+Date: 2026-10-19
+
+Author: Lorenzo Coacci
+"""
+
+
+# + + + + + Exceptions + + + + +
+class IagoError(Exception):
+    """
+    IagoError : raised instead of returning a failed Result
+    (when Iago is created with raise_errors=True)
+
+    Attributes
+    ----------
+    result : Result
+        The failed result
+    """
+    def __init__(self, result):
+        super().__init__(result.error)
+        self.result = result
+# + + + + + Exceptions + + + + +
+
+
+# + + + + + Classes + + + + +
+class Result():
+    """
+    Result : the outcome of an Iago method
+
+    A light object (no __dict__) with status, value and error, the
+    error message is formatted only when it is read. It can still be
+    used as the old {"status", "error", "value"} dict
+
+    Parameters
+    ----------
+    status (optional): bool
+        Did it work?
+    value (optional): any
+        The value returned
+    error (optional): string
+        The error message (a format string if error_args are given)
+    error_args (optional): tuple
+        The arguments of the error format string (ex: the exception)
+    timeout (optional): bool
+        Did it fail because the time ran out?
+    """
+    __slots__ = ("status", "value", "timeout", "_error", "_error_args")
+    KEYS = ("status", "error", "value", "timeout")
+
+    def __init__(self, status=True, value=None, error="", error_args=(), timeout=False):
+        self.status = status
+        self.value = value
+        self.timeout = timeout
+        self._error = error
+        self._error_args = error_args
+
+    @property
+    def error(self):
+        if self._error_args:
+            self._error = self._error.format(*[str(arg) for arg in self._error_args])
+            self._error_args = ()
+        return self._error
+
+    def __getitem__(self, key):
+        if key not in self.KEYS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __contains__(self, key):
+        return key in self.KEYS
+
+    def get(self, key, default=None):
+        """
+        RETURN : the field key (like dict.get)
+        """
+        if key not in self.KEYS:
+            return default
+        return getattr(self, key)
+
+    def keys(self):
+        """
+        RETURN : tuple, the fields (like dict.keys)
+        """
+        return self.KEYS
+
+    def to_dict(self):
+        """
+        RETURN : dict, {"status", "error", "value", "timeout"}
+        """
+        return {key: getattr(self, key) for key in self.KEYS}
+
+    def __repr__(self):
+        if self.status:
+            return "Result(status=True, value={!r})".format(self.value)
+        return "Result(status=False, error={!r})".format(self.error)
+# + + + + + Classes + + + + +
@@ -0,0 +1,295 @@
+"""
+segmentation
+------------
+This script contains
+the SpeakerSegmenter class
+(who speaks when, without music and silence)
+
+Date: 2026-10-19
+
+Author: Lorenzo Coacci
+"""
+# + + + + + Libraries + + + + +
+# to manage the samples
+import numpy as np
+# to measure the speed
+import time
+# + + + + + Libraries + + + + +
+
+
+# + + + + + Functions + + + + +
+def mel_filterbank(n_bands, nfft, rate):
+    """
+    RETURN : numpy array (n_bands, nfft // 2 + 1), triangular mel filters
+    """
+    def to_mel(hz):
+        return 2595.0 * np.log10(1.0 + hz / 700.0)
+
+    def to_hz(mel):
+        return 700.0 * (10 ** (mel / 2595.0) - 1.0)
+
+    edges = to_hz(np.linspace(to_mel(0.0), to_mel(rate / 2.0), n_bands + 2))
+    bins = np.fft.rfftfreq(nfft, 1.0 / rate)
+    lower, center, upper = edges[:-2, None], edges[1:-1, None], edges[2:, None]
+    rising = (bins - lower) / (center - lower)
+    falling = (upper - bins) / (upper - center)
+    return np.maximum(0.0, np.minimum(rising, falling))
+
+
+def frame_features(samples, rate, frame_duration=0.025, hop_duration=0.010,
+                   n_bands=24, n_coefficients=13, block_frames=6000):
+    """
+    RETURN : (energy, cepstra) numpy arrays, the energy in dB and the
+             mel cepstral coefficients of every frame (one row per hop)
+
+    All the frames of a block go through one FFT call, blocks keep
+    the memory flat on long recordings
+
+    Parameters
+    ----------
+    samples : numpy array
+        The mono samples (int16)
+    rate : int
+        The sample rate of samples
+    frame_duration (optional): float
+        Seconds of audio in a frame
+    hop_duration (optional): float
+        Seconds between two frames
+    n_bands (optional): int
+        The mel bands
+    n_coefficients (optional): int
+        The cepstral coefficients to keep
+    block_frames (optional): int
+        Frames processed at once
+    """
+    frame = int(rate * frame_duration)
+    hop = int(rate * hop_duration)
+    n_frames = 1 + (len(samples) - frame) // hop if len(samples) >= frame else 0
+    energy = np.empty(n_frames)
+    cepstra = np.empty((n_frames, n_coefficients))
+    if n_frames == 0:
+        return energy, cepstra
+
+    nfft = 1 << (frame - 1).bit_length()
+    window = np.hamming(frame)
+    bank = mel_filterbank(n_bands, nfft, rate).T
+    # DCT-II matrix (cepstra from the log mel energies)
+    dct = np.cos(np.pi / n_bands * (np.arange(n_bands)[:, None] + 0.5) * np.arange(n_coefficients))
+
+    x = samples.astype(np.float64)
+    # pre-emphasis (flatten the speech spectrum tilt) for the cepstra only
+    y = np.append(x[0], x[1:] - 0.97 * x[:-1])
+    for start in range(0, n_frames, block_frames):
+        stop = min(start + block_frames, n_frames)
+        shape = (stop - start, frame)
+        strides = (hop * x.strides[0], x.strides[0])
+        frames = np.lib.stride_tricks.as_strided(x[start * hop:], shape=shape, strides=strides)
+        energy[start:stop] = 10 * np.log10(np.mean(frames ** 2, axis=1) + 1e-10)
+        frames = np.lib.stride_tricks.as_strided(y[start * hop:], shape=shape, strides=strides)
+        spectrum = np.abs(np.fft.rfft(frames * window, nfft)) ** 2
+        cepstra[start:stop] = np.log(spectrum @ bank + 1e-10) @ dct
+    return energy, cepstra
+
+
+def kmeans(points, k, iterations=50, seed=0):
+    """
+    RETURN : numpy int array, the cluster of every point (k-means++ init)
+    """
+    rng = np.random.RandomState(seed)
+    centers = points[[rng.randint(len(points))]]
+    while len(centers) < k:
+        distances = ((points[:, None, :] - centers[None]) ** 2).sum(-1).min(1)
+        if distances.sum() == 0:
+            break
+        centers = np.vstack([centers, points[rng.choice(len(points), p=distances / distances.sum())]])
+    labels = None
+    for _ in range(iterations):
+        new_labels = ((points[:, None, :] - centers[None]) ** 2).sum(-1).argmin(1)
+        if labels is not None and (new_labels == labels).all():
+            break
+        labels = new_labels
+        centers = np.array([points[labels == c].mean(0) if (labels == c).any() else centers[c]
+                            for c in range(len(centers))])
+    return labels
+# + + + + + Functions + + + + +
+
+
+# + + + + + Classes + + + + +
+class SpeakerSegmenter():
+    """
+    SpeakerSegmenter : split a recording in speaker turns
+
+    Finds the speech windows (energy over the noise floor and the
+    pauses of speech, so steady hold music is dropped), clusters their
+    cepstra in n_speakers and merges them in turns. The speakers are
+    numbered by order of appearance (0 speaks first)
+
+    Parameters
+    ----------
+    n_speakers (optional): int
+        How many speakers are in the recording
+    window (optional): float
+        Seconds of a clustering window (the finest turn)
+    energy_margin (optional): float
+        dB over the noise floor to be voice
+    min_speech (optional): float
+        Fraction of voiced frames for a window to be speech
+    music_threshold (optional): float
+        Min fraction of low energy frames in a speech window (music
+        is steadier than speech)
+    max_gap (optional): float
+        Seconds of silence allowed inside a turn
+    min_turn (optional): float
+        Shorter turns are dropped
+    sample_rate (optional): int
+        The rate of the analysis
+
+    Attributes
+    ----------
+    stats : dict
+        audio, speech, music and processing seconds
+
+    Methods
+    -------
+    segment(audio)
+        [{"speaker": speaker, "start": seconds, "end": seconds}, ...]
+    select(audio, speakers)
+        [(turn, AudioData), ...] of the wanted speakers
+    real_time_factor()
+        Processing seconds per audio second (< 1 is faster than real time)
+    """
+    def __init__(self, n_speakers=2, window=1.0, energy_margin=15.0,
+                 min_speech=0.3, music_threshold=0.15, max_gap=1.0,
+                 min_turn=0.3, sample_rate=16000):
+        self.n_speakers = n_speakers
+        self.window = window
+        self.energy_margin = energy_margin
+        self.min_speech = min_speech
+        self.music_threshold = music_threshold
+        self.max_gap = max_gap
+        self.min_turn = min_turn
+        self.sample_rate = sample_rate
+        self.hop_duration = 0.010
+        self.stats = {"audio": 0.0, "speech": 0.0, "music": 0.0, "processing": 0.0}
+
+    def segment(self, audio):
+        """
+        RETURN : list, the turns [{"speaker": speaker, "start": seconds, "end": seconds}, ...]
+
+        Parameters
+        ----------
+        audio : AudioData
+            The recording (from speech_recognition)
+        """
+        start_time = time.time()
+        raw = audio.get_raw_data(convert_rate=self.sample_rate, convert_width=2)
+        samples = np.frombuffer(raw, dtype=np.int16)
+        turns = self._segment(samples)
+        self.stats["audio"] += len(samples) / float(self.sample_rate)
+        self.stats["processing"] += time.time() - start_time
+        return turns
+
+    def select(self, audio, speakers=None):
+        """
+        RETURN : list, [(turn, AudioData), ...] only for speakers
+
+        Parameters
+        ----------
+        audio : AudioData
+            The recording (from speech_recognition)
+        speakers (optional): list
+            The speakers to keep (None for all)
+        """
+        selected = []
+        for turn in self.segment(audio):
+            if speakers is None or turn["speaker"] in speakers:
+                selected.append((turn, audio.get_segment(turn["start"] * 1000, turn["end"] * 1000)))
+        return selected
+
+    def real_time_factor(self):
+        """
+        RETURN : float, processing seconds per audio second
+        """
+        if self.stats["audio"] == 0:
+            return None
+        return self.stats["processing"] / self.stats["audio"]
+
+    def _segment(self, samples):
+        energy, cepstra = frame_features(samples, self.sample_rate, hop_duration=self.hop_duration)
+        per_window = int(round(self.window / self.hop_duration))
+        if len(energy) == 0:
+            return []
+
+        # window x frame matrices, the tail is padded to a whole window
+        # (the last words are there) and the padding is never voiced
+        n_windows = -(-len(energy) // per_window)
+        pad = n_windows * per_window - len(energy)
+        floor = np.percentile(energy, 10)
+        valid = np.arange(n_windows * per_window).reshape(n_windows, per_window) < len(energy)
+        energy = np.append(energy, np.full(pad, -np.inf)).reshape(n_windows, per_window)
+        cepstra = np.vstack([cepstra, np.zeros((pad, cepstra.shape[1]))]).reshape(n_windows, per_window, -1)
+        frames = valid.sum(1)
+        voiced = energy > floor + self.energy_margin
+        speech = voiced.sum(1) >= self.min_speech * frames
+        # low short-time energy ratio: speech has pauses between syllables
+        power = np.where(valid, 10 ** (energy / 10), 0.0)
+        mean_power = power.sum(1, keepdims=True) / frames[:, None]
+        low_energy = ((power < 0.5 * mean_power) & valid).sum(1) / frames
+        music = speech & (low_energy < self.music_threshold)
+        speech &= ~music
+        self.stats["speech"] += float(frames[speech].sum()) * self.hop_duration
+        self.stats["music"] += float(frames[music].sum()) * self.hop_duration
+        # a tail shorter than half a window is too short for a voice print,
+        # it only extends the turn before it
+        tail = n_windows - 1 if frames[-1] < per_window / 2.0 else None
+        clustered = speech.copy()
+        if tail is not None:
+            clustered[tail] = False
+        indexes = np.flatnonzero(clustered)
+        if len(indexes) == 0:
+            return []
+
+        # a voice print per window: mean and spread of the voiced cepstra (no c0)
+        weights = voiced[indexes][:, :, None]
+        count = weights.sum(1)
+        mean = (cepstra[indexes, :, 1:] * weights).sum(1) / count
+        spread = np.sqrt((((cepstra[indexes, :, 1:] - mean[:, None]) ** 2) * weights).sum(1) / count)
+        points = np.hstack([mean, spread])
+        points = (points - points.mean(0)) / (points.std(0) + 1e-10)
+        labels = kmeans(points, min(self.n_speakers, len(indexes)))
+
+        # a window between two of the same speaker is that speaker
+        if len(labels) > 2:
+            middle = (labels[:-2] == labels[2:]) & (labels[1:-1] != labels[:-2])
+            labels[1:-1][middle] = labels[:-2][middle]
+        # number the speakers by order of appearance
+        order = {}
+        for label in labels:
+            order.setdefault(label, len(order))
+        labels = [order[label] for label in labels]
+
+        if tail is not None and speech[tail] and indexes[-1] == tail - 1:
+            indexes = np.append(indexes, tail)
+            labels.append(labels[-1])
+        return self._turns(indexes, labels, voiced)
+
+    def _turns(self, indexes, labels, voiced):
+        max_gap = int(round(self.max_gap / self.window))
+        turns = []
+        for index, label in zip(indexes, labels):
+            if turns and turns[-1]["speaker"] == label and index - turns[-1]["last"] <= max_gap + 1:
+                turns[-1]["last"] = index
+            else:
+                turns.append({"speaker": label, "first": index, "last": index})
+
+        result = []
+        for turn in turns:
+            # cut at the first and last voiced frames
+            first = np.flatnonzero(voiced[turn["first"]])[0]
+            last = np.flatnonzero(voiced[turn["last"]])[-1] + 1
+            start = turn["first"] * self.window + first * self.hop_duration
+            end = turn["last"] * self.window + last * self.hop_duration
+            if end - start >= self.min_turn:
+                result.append({"speaker": turn["speaker"], "start": round(float(start), 2), "end": round(float(end), 2)})
+        return result
+# + + + + + Classes + + + + +
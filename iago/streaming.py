@@ -0,0 +1,235 @@
+"""
+streaming
+---------
+This script contains
+the StreamingRecognizer class
+(incremental offline speech 2 text)
+
+Date: 2026-10-19
+
+Author: Lorenzo Coacci
+"""
+# + + + + + Libraries + + + + +
+# to manage json results from the decoder
+import json
+# to share a decoder between threads
+import threading
+# for log funcs
+from .logger import iago_logger
+# to manage the streaming offline decoder (optional)
+try:
+    import vosk
+except ImportError:
+    vosk = None
+# + + + + + Libraries + + + + +
+
+
+# + + + + + Classes + + + + +
+class StreamingRecognizer():
+    """
+    StreamingRecognizer : incremental offline speech recognition
+
+    Feed raw PCM frames while they arrive from the mic and get
+    interim (partial) hypotheses back, the final hypothesis of an
+    utterance is marked as stable
+
+    Parameters
+    ----------
+    model_path (optional): string
+        The path to a Vosk model folder (if None the model is
+        picked by language)
+    language (optional): string
+        The language to recognize (ex: en-US, it-IT)
+    model (optional): vosk.Model
+        An already loaded model to share (model_path and language
+        only name it then), every StreamingRecognizer has its own decoder
+    sample_rate (optional): int
+        The sample rate of the frames you are going to feed
+    show_debug (optional) : bool
+        Show the debug info if it fails?
+
+    Attributes
+    ----------
+    text : string
+        The current hypothesis of the utterance
+
+    Methods
+    -------
+    subscribe(callback)
+        Call callback(result) for every new partial or final result
+    feed(frame)
+        Feed raw PCM bytes (16 bit mono)
+    finish()
+        Flush the decoder and get the final result
+    """
+    # the vosk model names of the BCP-47 languages (vosk exits if it has no model)
+    VOSK_LANGUAGES = {
+        "en-US": "en-us", "en-IN": "en-in",
+        "it-IT": "it", "fr-FR": "fr", "de-DE": "de", "es-ES": "es",
+        "pt-BR": "pt", "pt-PT": "pt", "nl-NL": "nl", "ru-RU": "ru",
+        "uk-UA": "uk", "pl-PL": "pl", "cs-CZ": "cs", "tr-TR": "tr",
+        "el-GR": "gr", "ca-ES": "ca", "ar-SA": "ar", "fa-IR": "fa",
+        "hi-IN": "hi", "ja-JP": "ja", "ko-KR": "ko", "zh-CN": "cn",
+        "vi-VN": "vn", "fil-PH": "tl-ph", "kk-KZ": "kz",
+    }
+
+    def __init__(self, model_path=None, language='en-US',
+                 sample_rate=16000, model=None, show_debug=True):
+        if vosk is None:
+            raise ImportError("Streaming recognition needs vosk, install it with: pip install vosk")
+        if not show_debug:
+            vosk.SetLogLevel(-1)
+
+        # load the model (the slow part, keep the object around)
+        if model is not None:
+            self.model = model
+        else:
+            try:
+                if model_path is not None:
+                    self.model = vosk.Model(model_path)
+                else:
+                    self.model = vosk.Model(lang=self.vosk_language(language))
+            except SystemExit:
+                # vosk calls sys.exit when it has no model for the language
+                if show_debug:
+                    iago_logger.error("Vosk has no model for {}", language)
+                raise RuntimeError("Vosk has no model for {} ({})".format(language, self.vosk_language(language)))
+            except Exception as e:
+                if show_debug:
+                    iago_logger.error("Cannot load the vosk model for this language", exception=e)
+                raise
+
+        self.sample_rate = sample_rate
+        self.language = language
+        self.text = ""
+        self._callbacks = []
+        self._lock = threading.Lock()
+        self.reset()
+
+    @classmethod
+    def vosk_language(cls, language):
+        """
+        RETURN : string, the vosk model language of a BCP-47 language
+                 (ex: en-US -> en-us, it-IT -> it)
+        """
+        if language in cls.VOSK_LANGUAGES:
+            return cls.VOSK_LANGUAGES[language]
+        # unknown region: the generic model of the language
+        return language.split("-")[0].lower()
+
+    def reset(self):
+        """
+        RETURN : None, start a new utterance
+        """
+        self.decoder = vosk.KaldiRecognizer(self.model, self.sample_rate)
+        self.decoder.SetWords(True)
+        self.text = ""
+
+    def subscribe(self, callback):
+        """
+        RETURN : None, callback(result) is called for every new result
+
+        Parameters
+        ----------
+        callback : function
+            A function receiving {"text": text, "stable": True/False, "confidence": conf}
+        """
+        self._callbacks.append(callback)
+
+    def unsubscribe(self, callback):
+        """
+        RETURN : None, stop calling callback
+        """
+        if callback in self._callbacks:
+            self._callbacks.remove(callback)
+
+    def feed(self, frame):
+        """
+        RETURN : {"text": text, "stable": True/False, "confidence": conf}
+                 or None if the hypothesis did not change
+
+        Parameters
+        ----------
+        frame : bytes
+            Raw PCM frame (16 bit, mono, self.sample_rate)
+
+        Returns
+        -------
+        result : dict
+            The interim (stable False) or final (stable True) result
+        """
+        if self.decoder.AcceptWaveform(frame):
+            # end of utterance detected by the decoder
+            result = self._emit(self._parse_final(self.decoder.Result()))
+            self.text = ""
+            return result
+
+        partial = json.loads(self.decoder.PartialResult()).get("partial", "")
+        if partial == self.text:
+            return None
+        return self._emit({"text": partial, "stable": False, "confidence": None})
+
+    def finish(self):
+        """
+        RETURN : {"text": text, "stable": True, "confidence": conf},
+                 the final result of the current utterance
+        """
+        result = self._emit(self._parse_final(self.decoder.FinalResult()))
+        self.reset()
+        return result
+
+    def recognize(self, audio, with_confidence=False):
+        """
+        RETURN : the final sentence (string) of a whole AudioData,
+                 (sentence, confidence) if with_confidence
+
+        Parameters
+        ----------
+        audio : AudioData
+            The audio (from speech_recognition) to convert in text
+        with_confidence (optional): bool
+            Return the mean word confidence too (None if no words)?
+        """
+        # one whole audio at a time (the decoder is cached and shared)
+        with self._lock:
+            return self._recognize(audio, with_confidence)
+
+    def _recognize(self, audio, with_confidence):
+        self.reset()
+        raw = audio.get_raw_data(convert_rate=self.sample_rate, convert_width=2)
+        # feed in ~0.25s frames as a mic would
+        step = self.sample_rate // 2
+        sentences = []
+        confidences = []
+        for i in range(0, len(raw), step):
+            result = self.feed(raw[i:i + step])
+            if result is not None and result["stable"] and result["text"]:
+                sentences.append(result["text"])
+                confidences.append(result["confidence"])
+        last = self.finish()
+        if last["text"]:
+            sentences.append(last["text"])
+            confidences.append(last["confidence"])
+        if not with_confidence:
+            return " ".join(sentences)
+        confidences = [c for c in confidences if c is not None]
+        confidence = sum(confidences) / len(confidences) if confidences else None
+        return " ".join(sentences), confidence
+
+    def _parse_final(self, raw_result):
+        data = json.loads(raw_result)
+        words = data.get("result", [])
+        confidence = None
+        if words:
+            confidence = sum(w.get("conf", 0.0) for w in words) / len(words)
+        return {"text": data.get("text", ""), "stable": True, "confidence": confidence}
+
+    def _emit(self, result):
+        self.text = result["text"]
+        for callback in list(self._callbacks):
+            try:
+                callback(result)
+            except Exception as e:
+                iago_logger.warning("A partial result subscriber failed -> {}", e)
+        return result
+# + + + + + Classes + + + + +
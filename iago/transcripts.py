@@ -0,0 +1,273 @@
+"""
+transcripts
+-----------
+This script contains
+the TranscriptStore class
+(persistent, full-text searchable recognition results)
+
+Date: 2026-10-19
+
+Author: Lorenzo Coacci
+"""
+# + + + + + Libraries + + + + +
+# to flush the buffer when Python exits
+import atexit
+# to manage data - pandas
+import pandas as pd
+# to manage the store
+import sqlite3
+# to share the store between threads
+import threading
+# to manage time
+import time
+# for log funcs
+from .logger import iago_logger
+# + + + + + Libraries + + + + +
+
+
+# + + + + + Classes + + + + +
+class TranscriptStore():
+    """
+    TranscriptStore : a full-text index over recognition results
+
+    Every transcript is saved in SQLite with its metadata, the text is
+    indexed with FTS5 for fast word, phrase and prefix queries.
+    Inserts are buffered and written in batched transactions (when
+    the batch is full, every flush_interval seconds and at exit)
+
+    Parameters
+    ----------
+    path (optional): string
+        The SQLite file (":memory:" for a temporary store)
+    batch_size (optional): int
+        How many transcripts to buffer before writing them
+    flush_interval (optional): float
+        Max seconds a transcript waits in the buffer (checked on add)
+    show_debug (optional) : bool
+        Show the debug info if it fails?
+
+    Methods
+    -------
+    add(text, ...)
+        Save a transcript (buffered)
+    add_many(rows)
+        Save many transcripts in one transaction
+    search(query, phrase=False, prefix=False)
+        Full-text search
+    to_dataframe(query=None)
+        Export (all or matching) transcripts to pandas
+    """
+    COLUMNS = ("text", "source", "offset", "backend", "language",
+               "latency", "confidence", "timestamp")
+
+    def __init__(self, path="./iago_transcripts.db", batch_size=1000,
+                 flush_interval=5.0, show_debug=True):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.show_debug = show_debug
+        self._buffer = []
+        self._buffered_since = None
+        self._lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.executescript("""
+            PRAGMA journal_mode=WAL;
+            PRAGMA synchronous=NORMAL;
+            CREATE TABLE IF NOT EXISTS transcripts (
+                id INTEGER PRIMARY KEY,
+                text TEXT,
+                source TEXT,
+                offset REAL,
+                backend TEXT,
+                language TEXT,
+                latency REAL,
+                confidence REAL,
+                timestamp REAL);
+            CREATE VIRTUAL TABLE IF NOT EXISTS transcripts_fts
+                USING fts5(text, content='transcripts', content_rowid='id');
+            CREATE TRIGGER IF NOT EXISTS transcripts_insert AFTER INSERT ON transcripts BEGIN
+                INSERT INTO transcripts_fts(rowid, text) VALUES (new.id, new.text);
+            END;
+            CREATE TRIGGER IF NOT EXISTS transcripts_delete AFTER DELETE ON transcripts BEGIN
+                INSERT INTO transcripts_fts(transcripts_fts, rowid, text) VALUES ('delete', old.id, old.text);
+            END;
+        """)
+        # an interactive session rarely fills a batch, do not lose it
+        atexit.register(self.close)
+
+    def add(self, text, source=None, offset=None, backend=None, language=None,
+            latency=None, confidence=None, timestamp=None):
+        """
+        RETURN : None, buffer a transcript (written every batch_size
+                 or flush_interval seconds)
+
+        Parameters
+        ----------
+        text : string
+            The recognized text
+        source (optional): string
+            Where the audio comes from (file path, mic...)
+        offset (optional): float
+            The offset (seconds) inside source
+        backend (optional): string
+            The API/engine used to recognize
+        language (optional): string
+            The language recognized
+        latency (optional): float
+            Seconds spent to recognize
+        confidence (optional): float
+            The confidence of the backend
+        timestamp (optional): float
+            Unix time (now if None)
+        """
+        if timestamp is None:
+            timestamp = time.time()
+        with self._lock:
+            if not self._buffer:
+                self._buffered_since = time.time()
+            self._buffer.append((text, source, offset, backend, language,
+                                 latency, confidence, timestamp))
+            if len(self._buffer) >= self.batch_size or \
+                    time.time() - self._buffered_since >= self.flush_interval:
+                self._flush()
+
+    def add_result(self, result, **kwargs):
+        """
+        RETURN : None, save an Iago result (only if it has a value)
+
+        Parameters
+        ----------
+        result : dict
+            {"status": True/False, "error": error_msg, "value": value}
+        kwargs : the metadata of add
+        """
+        if result["status"] and result["value"]:
+            self.add(result["value"], **kwargs)
+
+    def add_many(self, rows):
+        """
+        RETURN : None, save many transcripts in a single transaction
+
+        Parameters
+        ----------
+        rows : list of dict
+            Each dict has "text" and any metadata of add
+        """
+        now = time.time()
+        with self._lock:
+            self._buffer.extend(tuple(row.get(column, now if column == "timestamp" else None)
+                                      for column in self.COLUMNS)
+                                for row in rows)
+            self._flush()
+
+    def flush(self):
+        """
+        RETURN : None, write the buffered transcripts
+        """
+        with self._lock:
+            self._flush()
+
+    def close(self):
+        """
+        RETURN : None, flush and close the store (called at exit too)
+        """
+        atexit.unregister(self.close)
+        with self._lock:
+            if self.connection is None:
+                return
+            try:
+                self._flush()
+            finally:
+                self.connection.close()
+                self.connection = None
+
+    def count(self):
+        """
+        RETURN : int, the number of saved transcripts
+        """
+        with self._lock:
+            self._flush()
+            return self.connection.execute("SELECT COUNT(*) FROM transcripts").fetchone()[0]
+
+    def search(self, query, phrase=False, prefix=False, limit=100):
+        """
+        RETURN : list of dict, the best matching transcripts
+
+        Parameters
+        ----------
+        query : string
+            The FTS5 query (ex: iago OR alexa)
+        phrase (optional): bool
+            Match the exact words sequence of query?
+        prefix (optional): bool
+            Match words starting with the (last) term of query?
+        limit (optional): int
+            The max number of results (None for all)
+
+        Returns
+        -------
+        results : list
+            The matching transcripts (best first)
+        """
+        sql, parameters = self._match(query, phrase=phrase, prefix=prefix, limit=limit)
+        with self._lock:
+            self._flush()
+            return [dict(row) for row in self.connection.execute(sql, parameters)]
+
+    def to_dataframe(self, query=None, phrase=False, prefix=False, limit=None):
+        """
+        RETURN : pandas DataFrame of the transcripts (all or matching query)
+
+        Parameters
+        ----------
+        query (optional): string
+            The FTS5 query (None for all the transcripts)
+        phrase (optional): bool
+            Match the exact words sequence of query?
+        prefix (optional): bool
+            Match words starting with the (last) term of query?
+        limit (optional): int
+            The max number of results (None for all)
+
+        Returns
+        -------
+        df : DataFrame
+            One row for each transcript
+        """
+        if query is None:
+            sql, parameters = "SELECT * FROM transcripts ORDER BY id", ()
+            if limit is not None:
+                sql, parameters = sql + " LIMIT ?", (limit,)
+        else:
+            sql, parameters = self._match(query, phrase=phrase, prefix=prefix, limit=limit)
+        with self._lock:
+            self._flush()
+            return pd.read_sql_query(sql, self.connection, params=parameters)
+
+    def _match(self, query, phrase=False, prefix=False, limit=None):
+        if phrase:
+            query = '"{}"'.format(query.replace('"', '""'))
+        if prefix:
+            query = query + "*"
+        sql = ("SELECT transcripts.* FROM transcripts_fts "
+               "JOIN transcripts ON transcripts.id = transcripts_fts.rowid "
+               "WHERE transcripts_fts MATCH ? ORDER BY rank")
+        if limit is None:
+            return sql, (query,)
+        return sql + " LIMIT ?", (query, limit)
+
+    def _flush(self):
+        if not self._buffer:
+            return
+        try:
+            with self.connection:
+                self.connection.executemany("INSERT INTO transcripts (text, source, offset, backend, language, "
+                                            "latency, confidence, timestamp) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                                            self._buffer)
+            self._buffer = []
+        except Exception as e:
+            if self.show_debug:
+                iago_logger.error("Cannot save the transcripts", exception=e)
+            raise
+# + + + + + Classes + + + + +
@@ -17,12 +17,19 @@ setuptools.setup(
     license='MIT',
     include_package_data=True,
     install_requires=[
+       'numpy',
        'pandas',
        'playsound',
        'pyttsx3',
        'golog',
        'SpeechRecognition'
     ],
+    extras_require={
+       'streaming': ['vosk']
+    },
+    entry_points={
+       'console_scripts': ['iago = iago.cli:main']
+    },
     classifiers=[
         "Programming Language :: Python :: 3",
         "License :: OSI Approved :: MIT License",
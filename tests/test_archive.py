@@ -0,0 +1,106 @@
+"""
+test_archive
+------------
+This script contains
+the AudioArchive tests
+(round trip through a process exit, batched index commits)
+
+Date: 2026-10-19
+
+Author: Lorenzo Coacci
+"""
+# + + + + + Libraries + + + + +
+# to exit a process with a full queue
+import subprocess
+import sys
+# to keep the archives
+import tempfile
+# to block the writer
+import threading
+import time
+# to run the tests
+import unittest
+# to make the audio
+import numpy as np
+# to manage speech recognition (speech 2 text)
+import speech_recognition as sr
+# the code to test
+from iago.archive import AudioArchive
+# + + + + + Libraries + + + + +
+
+
+# + + + + + Functions + + + + +
+def tone(frequency, seconds=0.5, sample_rate=16000):
+    t = np.arange(int(seconds * sample_rate)) / float(sample_rate)
+    samples = (8000 * np.sin(2 * np.pi * frequency * t)).astype(np.int16)
+    return sr.AudioData(samples.tobytes(), sample_rate, 2)
+# + + + + + Functions + + + + +
+
+
+# + + + + + Classes + + + + +
+class AudioArchiveTest(unittest.TestCase):
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+
+    def test_round_trip_through_exit(self):
+        for codec in ("wav", "flac"):
+            path = "{}/{}".format(self.path, codec)
+            # append and exit without close(): the queue must reach the disk
+            code = ("import sys, numpy as np, speech_recognition as sr; from iago.archive import AudioArchive; "
+                    "t = np.arange(8000) / 16000.0; "
+                    "tone = lambda f: sr.AudioData((8000 * np.sin(2 * np.pi * f * t)).astype(np.int16).tobytes(), 16000, 2); "
+                    "a = AudioArchive(sys.argv[1], session='s1', codec=sys.argv[2], show_debug=False); "
+                    "[a.append(tone(200 + 100 * i), source='mic', offset=i) for i in range(5)]")
+            subprocess.check_call([sys.executable, "-c", code, path, codec])
+
+            archive = AudioArchive(path, codec=codec, show_debug=False)
+            rows = archive.utterances(session="s1")
+            self.assertEqual(len(rows), 5)
+            for i, row in enumerate(rows):
+                self.assertEqual(row["source_offset"], i)
+                result = archive.replay(row["id"])
+                self.assertTrue(result.status, result.error)
+                self.assertEqual(result.value.frame_data, tone(200 + 100 * i).frame_data)
+            archive.close()
+
+    def test_index_committed_under_steady_capture(self):
+        archive = AudioArchive(self.path, codec="wav", commit_rows=2,
+                               commit_interval=60, show_debug=False)
+        encode = archive._encode
+        queued, gate, calls = threading.Event(), threading.Event(), []
+
+        def slow_encode(audio):
+            # the queue never drains: hold the writer on the 1st and the 3rd utterance
+            calls.append(audio)
+            if len(calls) == 1:
+                queued.wait(5)
+            elif len(calls) == 3:
+                gate.wait(5)
+            return encode(audio)
+        archive._encode = slow_encode
+        for i in range(5):
+            archive.append(tone(300))
+        queued.set()
+        try:
+            start = time.time()
+            while len(archive.utterances()) < 2 and time.time() - start < 5:
+                time.sleep(0.05)
+            self.assertEqual(len(archive.utterances()), 2)
+        finally:
+            gate.set()
+        archive.flush()
+        self.assertEqual(len(archive.utterances()), 5)
+        archive.close()
+
+    def test_close_is_idempotent(self):
+        archive = AudioArchive(self.path, codec="wav", show_debug=False)
+        archive.append(tone(300))
+        archive.close()
+        archive.close()
+        self.assertFalse(archive.append(tone(300)).status)
+        self.assertEqual(len(archive.utterances()), 1)
+# + + + + + Classes + + + + +
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,136 @@
+"""
+test_encoding
+-------------
+This script contains
+the UploadEncoder tests
+(resample, trim_silence, the per backend report)
+
+Date: 2026-10-19
+
+Author: Lorenzo Coacci
+"""
+# + + + + + Libraries + + + + +
+# to run the tests
+import unittest
+# to make the audio
+import numpy as np
+# to manage speech recognition (speech 2 text)
+import speech_recognition as sr
+# the code to test
+from iago.encoding import UploadEncoder, resample, trim_silence
+from iago.governance import RequestGovernor
+from iago.iago import Iago
+# + + + + + Libraries + + + + +
+
+
+# + + + + + Functions + + + + +
+def tone(frequency, seconds, rate, amplitude=8000):
+    t = np.arange(int(seconds * rate)) / float(rate)
+    return (amplitude * np.sin(2 * np.pi * frequency * t)).astype(np.int16)
+
+
+def level(samples):
+    return np.sqrt(np.mean(samples.astype(np.float64) ** 2))
+# + + + + + Functions + + + + +
+
+
+# + + + + + Classes + + + + +
+class ResampleTest(unittest.TestCase):
+    def test_same_rate_is_untouched(self):
+        samples = tone(440, 0.1, 16000)
+        self.assertIs(resample(samples, 16000, 16000), samples)
+
+    def test_length_and_type(self):
+        samples = tone(440, 1.0, 48000)
+        for rate in (16000, 8000, 22050):
+            resampled = resample(samples, 48000, rate)
+            self.assertEqual(resampled.dtype, np.int16)
+            self.assertAlmostEqual(len(resampled), rate, delta=1)
+
+    def test_keeps_the_band(self):
+        # 1 kHz is under the new Nyquist (8 kHz): same level
+        resampled = resample(tone(1000, 1.0, 48000), 48000, 16000)
+        self.assertAlmostEqual(level(resampled[100:-100]), level(tone(1000, 1.0, 16000)), delta=300)
+
+    def test_anti_alias(self):
+        # 12 kHz would fold back to 4 kHz at 16 kHz: the filter removes it
+        resampled = resample(tone(12000, 1.0, 48000), 48000, 16000)
+        self.assertLess(level(resampled[100:-100]), 0.05 * level(tone(12000, 1.0, 48000)))
+
+
+class TrimSilenceTest(unittest.TestCase):
+    def test_trims_with_padding(self):
+        rate = 16000
+        samples = np.concatenate([np.zeros(rate), tone(440, 1.0, rate), np.zeros(rate)]).astype(np.int16)
+        trimmed = trim_silence(samples, rate, threshold=300, padding=0.2)
+        self.assertAlmostEqual(len(trimmed) / float(rate), 1.4, delta=0.02)
+
+    def test_all_silence_is_kept(self):
+        samples = np.zeros(16000, dtype=np.int16)
+        self.assertEqual(len(trim_silence(samples, 16000, threshold=300)), 16000)
+
+    def test_speech_to_the_end(self):
+        rate = 16000
+        samples = np.concatenate([np.zeros(rate), tone(440, 1.0, rate)]).astype(np.int16)
+        trimmed = trim_silence(samples, rate, threshold=300, padding=0.2)
+        self.assertEqual(len(trimmed), int(1.2 * rate))
+
+
+class UploadEncoderTest(unittest.TestCase):
+    def audio(self):
+        samples = np.concatenate([np.zeros(48000), tone(440, 1.0, 48000), np.zeros(48000)]).astype(np.int16)
+        return sr.AudioData(samples.tobytes(), 48000, 2)
+
+    def test_encode_and_report(self):
+        encoder = UploadEncoder(padding=0.2)
+        encoded = encoder.encode(self.audio(), "google")
+        self.assertEqual(encoded.sample_rate, 16000)
+        self.assertEqual(encoded.sample_width, 2)
+        encoder.add_latency("google", 0.5)
+        encoder.add_latency("google", 1.5)
+        report = encoder.report()
+        row = report.loc["google"]
+        self.assertEqual(row["calls"], 1)
+        self.assertEqual(row["bytes_in"], 3 * 48000 * 2)
+        self.assertEqual(row["bytes_out"], len(encoded.frame_data))
+        self.assertEqual(row["bytes_saved"], row["bytes_in"] - row["bytes_out"])
+        # 3 s at 48 kHz -> 1.4 s (1 s tone + padding) at 16 kHz
+        self.assertAlmostEqual(row["saved_percent"], 100 * (1 - 1.4 / 9), delta=0.5)
+        self.assertEqual(row["mean_latency"], 1.0)
+
+    def test_unknown_backend_is_sent_as_is(self):
+        encoder = UploadEncoder()
+        audio = self.audio()
+        self.assertIs(encoder.encode(audio, "custom"), audio)
+        self.assertEqual(len(encoder.report()), 0)
+
+    def test_bytes_in_before_the_width_conversion(self):
+        encoder = UploadEncoder(trim=False)
+        audio = sr.AudioData(np.zeros(16000, dtype=np.int32).tobytes(), 16000, 4)
+        encoder.encode(audio, "google")
+        row = encoder.report().loc["google"]
+        self.assertEqual(row["bytes_in"], 16000 * 4)
+        self.assertEqual(row["bytes_out"], 16000 * 2)
+
+    def test_report_of_the_backend_that_answered(self):
+        # google is down: the governor falls back and the fallback gets the bytes and the latency
+        encoder = UploadEncoder()
+        bot = Iago(upload_encoder=encoder, show_debug=False,
+                   governor=RequestGovernor(retries=0, failure_threshold=1, fallback="offline"))
+
+        def recognize(audio, recognizer='google', language='en-US', speech_recognizer=None, **kwargs):
+            if recognizer == "google":
+                raise sr.RequestError("recognition request failed: Service Unavailable")
+            return "hello", None
+        bot._recognize = recognize
+        result = bot.speech_to_text(self.audio(), recognizer="google", show_debug=False)
+        self.assertEqual(result.value, "hello")
+        report = encoder.report()
+        self.assertEqual(list(report.index), ["offline"])
+        self.assertEqual(report.loc["offline", "calls"], 1)
+        self.assertGreaterEqual(report.loc["offline", "mean_latency"], 0)
+# + + + + + Classes + + + + +
+
+
+if __name__ == "__main__":
+    unittest.main()
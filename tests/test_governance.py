@@ -0,0 +1,231 @@
+"""
+test_governance
+---------------
+This script contains
+the RequestGovernor tests
+(against a local fake HTTP service answering 503/429)
+
+Date: 2026-10-19
+
+Author: Lorenzo Coacci
+"""
+# + + + + + Libraries + + + + +
+# to fake the cloud service
+import http.server
+# to share the bucket with another process
+import subprocess
+import sys
+# to keep the bucket files
+import tempfile
+# to serve in background
+import threading
+# to check the optional fallbacks
+import importlib.util
+# to manage time
+import time
+# to run the tests
+import unittest
+# to call the fake service
+import urllib.error
+import urllib.request
+# to manage speech recognition errors
+import speech_recognition as sr
+# the code to test
+from iago.governance import RequestGovernor, TokenBucket, CircuitBreaker, RateLimitError, CircuitOpenError
+# + + + + + Libraries + + + + +
+
+
+# + + + + + Classes + + + + +
+class FakeService(http.server.ThreadingHTTPServer):
+    """
+    FakeService : answers the queued status codes (200 when empty)
+    """
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), FakeHandler)
+        self.statuses = []
+        self.hits = 0
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+
+    @property
+    def url(self):
+        return "http://127.0.0.1:{}/recognize".format(self.server_address[1])
+
+    def next_status(self):
+        with self._lock:
+            self.hits += 1
+            return self.statuses.pop(0) if self.statuses else 200
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+class FakeHandler(http.server.BaseHTTPRequestHandler):
+    def do_GET(self):
+        status = self.server.next_status()
+        body = b"hello" if status == 200 else b"busy"
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class GovernanceTest(unittest.TestCase):
+    def setUp(self):
+        self.service = FakeService()
+        self.state_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        self.service.stop()
+
+    def recognize(self, backend, url=None):
+        # what a speech_recognition backend does with HTTP errors
+        if backend == "offline":
+            return "offline"
+        try:
+            return urllib.request.urlopen(url or self.service.url, timeout=5).read().decode()
+        except urllib.error.HTTPError as e:
+            raise sr.RequestError("recognition request failed: {}".format(e.reason))
+        except urllib.error.URLError as e:
+            raise sr.RequestError("recognition connection failed: {}".format(e.reason))
+
+    def governor(self, **kwargs):
+        settings = dict(rate=1000, capacity=1000, state_dir=self.state_dir,
+                        retries=3, backoff=0.01, max_backoff=0.02,
+                        failure_threshold=3, reset_timeout=0.2, fallback="offline")
+        settings.update(kwargs)
+        return RequestGovernor(**settings)
+
+    def test_retry_on_503_and_429(self):
+        self.service.statuses = [503, 429]
+        result = self.governor().call("google", self.recognize, show_debug=False)
+        self.assertEqual(result, ("google", "hello"))
+        self.assertEqual(self.service.hits, 3)
+
+    def test_retries_exhausted(self):
+        self.service.statuses = [503] * 10
+        governor = self.governor(retries=1, failure_threshold=10)
+        with self.assertRaises(sr.RequestError):
+            governor.call("google", self.recognize, show_debug=False)
+        self.assertEqual(self.service.hits, 2)
+
+    def test_circuit_opens_and_falls_back(self):
+        self.service.statuses = [503] * 10
+        governor = self.governor(retries=5)
+        self.assertEqual(governor.call("google", self.recognize, show_debug=False), ("offline", "offline"))
+        self.assertEqual(self.service.hits, 3)
+        self.assertEqual(governor.breaker("google").state, "open")
+        # open: the service is not called at all
+        self.assertEqual(governor.call("google", self.recognize, show_debug=False), ("offline", "offline"))
+        self.assertEqual(self.service.hits, 3)
+
+    def test_half_open_trial_closes_the_circuit(self):
+        self.service.statuses = [503] * 3
+        governor = self.governor(retries=5)
+        governor.call("google", self.recognize, show_debug=False)
+        time.sleep(0.25)
+        self.assertEqual(governor.call("google", self.recognize, show_debug=False), ("google", "hello"))
+        self.assertEqual(governor.breaker("google").state, "closed")
+
+    def test_half_open_trial_without_answer_reopens(self):
+        self.service.statuses = [503] * 3
+        governor = self.governor(retries=5, fallback=None)
+        with self.assertRaises(sr.RequestError):
+            governor.call("google", self.recognize, show_debug=False)
+        time.sleep(0.25)
+
+        def broken(backend):
+            raise ValueError("bug in the caller")
+        with self.assertRaises(ValueError):
+            governor.call("google", broken, show_debug=False)
+        self.assertEqual(governor.breaker("google").state, "open")
+        # not stuck in half_open: the next trial reaches the healthy service
+        time.sleep(0.25)
+        self.assertEqual(governor.call("google", self.recognize, show_debug=False), ("google", "hello"))
+
+    def test_bad_key_or_request_is_not_retried(self):
+        governor = self.governor(retries=5, failure_threshold=1)
+        for status in (403, 400, 401):
+            self.service.statuses = [status]
+            hits = self.service.hits
+            with self.assertRaises(sr.RequestError):
+                governor.call("google", self.recognize, show_debug=False)
+            self.assertEqual(self.service.hits, hits + 1)
+            # not hidden behind the fallback
+            self.assertEqual(governor.breaker("google").state, "closed")
+
+    def test_connection_failed_is_retried(self):
+        # a port nobody listens on
+        closed = FakeService()
+        url = closed.url
+        closed.stop()
+        governor = self.governor(retries=5)
+        result = governor.call("google", lambda backend: self.recognize(backend, url=url), show_debug=False)
+        self.assertEqual(result, ("offline", "offline"))
+        self.assertEqual(governor.breaker("google").state, "open")
+
+    def test_transient_errors(self):
+        governor = self.governor()
+        for message in ("recognition request failed: Service Unavailable",
+                        "recognition request failed: Too Many Requests",
+                        "503 The service is currently unavailable",
+                        "recognition connection failed: [Errno 111] Connection refused"):
+            self.assertTrue(governor.is_transient(sr.RequestError(message)), message)
+        for message in ("recognition request failed: Forbidden",
+                        "recognition request failed: Bad Request",
+                        "missing PocketSphinx module: ensure that PocketSphinx is set up correctly."):
+            self.assertFalse(governor.is_transient(sr.RequestError(message)), message)
+
+    def test_no_fallback_by_default(self):
+        self.service.statuses = [503] * 3
+        governor = self.governor(retries=5, fallback=None)
+        with self.assertRaises(CircuitOpenError):
+            governor.call("google", self.recognize, show_debug=False)
+        self.assertIsNone(RequestGovernor().fallback)
+
+    @unittest.skipIf(importlib.util.find_spec("pocketsphinx") is not None, "pocketsphinx is installed")
+    def test_missing_fallback_is_refused(self):
+        with self.assertRaises(ImportError):
+            RequestGovernor(fallback="sphinx")
+
+    def test_rate_limit(self):
+        governor = self.governor(rate=0.001, capacity=2, acquire_timeout=0)
+        governor.call("google", self.recognize, show_debug=False)
+        governor.call("google", self.recognize, show_debug=False)
+        with self.assertRaises(RateLimitError):
+            governor.call("google", self.recognize, show_debug=False)
+        self.assertEqual(self.service.hits, 2)
+        self.assertEqual(governor.breaker("google").state, "closed")
+
+    def test_bucket_shared_between_processes(self):
+        path = self.state_dir + "/google.bucket"
+        bucket = TokenBucket(0.001, 3, path=path)
+        self.assertEqual(bucket.try_acquire(2), 0)
+        # another process sees what this one took
+        code = ("import sys; from iago.governance import TokenBucket; "
+                "b = TokenBucket(0.001, 3, path=sys.argv[1]); "
+                "print(b.try_acquire() == 0, b.try_acquire() == 0)")
+        output = subprocess.check_output([sys.executable, "-c", code, path]).decode().split()
+        self.assertEqual(output[-2:], ["True", "False"])
+        self.assertGreater(bucket.try_acquire(), 0)
+
+    def test_breaker_half_open_is_time_boxed(self):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.1)
+        breaker.record_failure()
+        self.assertFalse(breaker.allow())
+        time.sleep(0.15)
+        self.assertTrue(breaker.allow())
+        # the trial never reports back
+        self.assertFalse(breaker.allow())
+        time.sleep(0.15)
+        self.assertTrue(breaker.allow())
+# + + + + + Classes + + + + +
+
+
+if __name__ == "__main__":
+    unittest.main()
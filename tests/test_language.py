@@ -0,0 +1,124 @@
+"""
+test_language
+-------------
+This script contains
+the LanguageRouter tests
+(with a stub identifier, no model needed)
+
+Date: 2026-10-19
+
+Author: Lorenzo Coacci
+"""
+# + + + + + Libraries + + + + +
+# to run the tests
+import unittest
+# the code to test
+from iago.language import LanguageRouter
+# + + + + + Libraries + + + + +
+
+
+# + + + + + Classes + + + + +
+class StubIdentifier():
+    """
+    StubIdentifier : always answers the same scores, counts the calls
+    """
+    def __init__(self, scores):
+        self.scores = scores
+        self.calls = 0
+
+    def __call__(self, audio, languages):
+        self.calls += 1
+        return {language: self.scores.get(language, 0.0) for language in languages}
+
+
+class LanguageRouterTest(unittest.TestCase):
+    def router(self, scores, **kwargs):
+        self.identifier = StubIdentifier(scores)
+        settings = dict(languages=("en-US", "it-IT"), prior_threshold=0.8,
+                        min_observations=3, decay=0.9)
+        settings.update(kwargs)
+        return LanguageRouter(self.identifier, **settings)
+
+    def test_identifier_is_required(self):
+        with self.assertRaises(TypeError):
+            LanguageRouter()
+
+    def test_route_identifies_a_new_session(self):
+        router = self.router({"en-US": 0.1, "it-IT": 0.9})
+        route = router.route(b"audio", backend="google")
+        self.assertEqual(route["language"], "it-IT")
+        self.assertEqual(route["backend"], "google")
+        self.assertTrue(route["identified"])
+        self.assertAlmostEqual(route["confidence"], 0.9)
+        self.assertEqual(self.identifier.calls, 1)
+
+    def test_backends_per_language(self):
+        router = self.router({"it-IT": 1.0}, backends={"it-IT": "vosk"})
+        self.assertEqual(router.route(b"audio", backend="google")["backend"], "vosk")
+
+    def test_confident_prior_skips_identification(self):
+        router = self.router({"en-US": 0.5, "it-IT": 0.5})
+        for _ in range(4):
+            router.observe("it-IT", routed=True)
+        self.assertGreater(router.prior()["it-IT"], 0.8)
+        route = router.route(b"audio")
+        self.assertEqual(route["language"], "it-IT")
+        self.assertFalse(route["identified"])
+        self.assertEqual(self.identifier.calls, 0)
+        self.assertEqual(router.stats()["skipped"], 1)
+
+    def test_min_observations_before_trusting_the_prior(self):
+        router = self.router({"en-US": 0.5, "it-IT": 0.5}, prior_threshold=0.5)
+        router.observe("it-IT")
+        router.observe("it-IT")
+        self.assertTrue(router.route(b"audio")["identified"])
+        router.observe("it-IT")
+        self.assertFalse(router.route(b"audio")["identified"])
+
+    def test_prior_weights_the_identifier(self):
+        router = self.router({"en-US": 0.6, "it-IT": 0.4}, prior_threshold=1.0)
+        for _ in range(3):
+            router.observe("it-IT")
+        # the session is Italian: a weak English score does not switch it
+        self.assertEqual(router.route(b"audio")["language"], "it-IT")
+
+    def test_misses_are_not_observations(self):
+        router = self.router({"en-US": 0.5, "it-IT": 0.5})
+        router.observe("it-IT")
+        for _ in range(5):
+            router.observe(None)
+        self.assertEqual(router.observations, 1)
+        self.assertTrue(router.route(b"audio")["identified"])
+
+    def test_a_miss_fades_the_prior(self):
+        router = self.router({"en-US": 0.5, "it-IT": 0.5})
+        for _ in range(3):
+            router.observe("it-IT")
+        confident = router.prior()["it-IT"]
+        router.observe(None)
+        self.assertLess(router.prior()["it-IT"], confident)
+
+    def test_calls_saved_counts_routed_recognitions(self):
+        router = self.router({"it-IT": 1.0}, languages=("en-US", "it-IT", "fr-FR"))
+        router.route(b"audio")
+        router.route(b"audio")
+        router.observe("it-IT", routed=True)
+        # the second utterance was not understood, the third not routed
+        router.observe(None)
+        router.observe("en-US")
+        stats = router.stats()
+        self.assertEqual(stats["utterances"], 2)
+        self.assertEqual(stats["recognized"], 1)
+        self.assertEqual(stats["calls_saved"], 2)
+
+    def test_feedback_accuracy(self):
+        router = self.router({"it-IT": 1.0})
+        self.assertIsNone(router.stats()["accuracy"])
+        router.feedback("it-IT", "it-IT")
+        router.feedback("it-IT", "en-US")
+        self.assertEqual(router.stats()["accuracy"], 0.5)
+# + + + + + Classes + + + + +
+
+
+if __name__ == "__main__":
+    unittest.main()
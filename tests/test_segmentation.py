@@ -0,0 +1,102 @@
+"""
+test_segmentation
+-----------------
+This script contains
+the SpeakerSegmenter tests
+(two synthetic voices, hold music and silence)
+
+Date: 2026-10-19
+
+Author: Lorenzo Coacci
+"""
+# + + + + + Libraries + + + + +
+# to run the tests
+import unittest
+# to make the audio
+import numpy as np
+# to manage speech recognition (speech 2 text)
+import speech_recognition as sr
+# the code to test
+from iago.segmentation import SpeakerSegmenter
+# + + + + + Libraries + + + + +
+
+
+# + + + + + Functions + + + + +
+RATE = 16000
+
+
+def voice(f0, seconds):
+    # a harmonic voice with 4 syllables per second (pauses in between)
+    t = np.arange(int(RATE * seconds)) / float(RATE)
+    syllables = (np.sin(2 * np.pi * 4 * t) > 0).astype(float)
+    return 3000 * syllables * sum(np.sin(2 * np.pi * f0 * k * t) / k for k in range(1, 15))
+
+
+def music(seconds):
+    # steady chords, no pauses
+    t = np.arange(int(RATE * seconds)) / float(RATE)
+    return 2000 * sum(np.sin(2 * np.pi * f * t) for f in (220, 277, 330))
+
+
+def silence(seconds):
+    return np.zeros(int(RATE * seconds))
+
+
+def audio(*parts):
+    # a room is never digital silence: a noise floor under everything
+    samples = np.concatenate(parts)
+    samples = samples + np.random.RandomState(0).randn(len(samples)) * 30
+    return sr.AudioData(samples.astype(np.int16).tobytes(), RATE, 2)
+# + + + + + Functions + + + + +
+
+
+# + + + + + Classes + + + + +
+class SpeakerSegmenterTest(unittest.TestCase):
+    def test_two_speakers_to_the_end(self):
+        # 16 s: A 0-3.3, B 4.2-7.6, A 8.3-11.4, B 12.2-16 (the last words end the recording)
+        recording = audio(voice(120, 3.3), silence(0.9), voice(260, 3.4), silence(0.7),
+                          voice(120, 3.1), silence(0.8), voice(260, 3.8))
+        turns = SpeakerSegmenter().segment(recording)
+        self.assertEqual([turn["speaker"] for turn in turns], [0, 1, 0, 1])
+        # the turns are found with window (1 s) resolution
+        for turn, (start, end) in zip(turns, [(0, 3.3), (4.2, 7.6), (8.3, 11.4), (12.2, 16)]):
+            self.assertAlmostEqual(turn["start"], start, delta=0.5)
+            self.assertAlmostEqual(turn["end"], end, delta=0.5)
+        # the last (partial) second is not lost
+        self.assertAlmostEqual(turns[-1]["end"], 16.0, delta=0.15)
+
+    def test_short_tail_extends_the_last_turn(self):
+        # the recording ends 0.3 s into a window
+        recording = audio(voice(120, 3.0), silence(1.0), voice(260, 3.3))
+        turns = SpeakerSegmenter().segment(recording)
+        self.assertEqual([turn["speaker"] for turn in turns], [0, 1])
+        self.assertAlmostEqual(turns[-1]["end"], 7.3, delta=0.15)
+
+    def test_music_and_silence_are_dropped(self):
+        recording = audio(voice(120, 3.0), music(4.0), silence(2.0), voice(260, 3.0))
+        segmenter = SpeakerSegmenter()
+        turns = segmenter.segment(recording)
+        self.assertEqual([turn["speaker"] for turn in turns], [0, 1])
+        self.assertLess(turns[0]["end"], 3.2)
+        self.assertGreater(turns[1]["start"], 8.8)
+        self.assertGreater(segmenter.stats["music"], 3.0)
+
+    def test_select_speakers(self):
+        recording = audio(voice(120, 2.0), silence(0.5), voice(260, 2.0), silence(0.5), voice(120, 2.0))
+        selected = SpeakerSegmenter().select(recording, speakers=[0])
+        self.assertEqual(len(selected), 2)
+        for turn, turn_audio in selected:
+            self.assertEqual(turn["speaker"], 0)
+            seconds = len(turn_audio.frame_data) / float(turn_audio.sample_rate * turn_audio.sample_width)
+            self.assertAlmostEqual(seconds, turn["end"] - turn["start"], delta=0.01)
+
+    def test_no_speech(self):
+        segmenter = SpeakerSegmenter()
+        self.assertEqual(segmenter.segment(audio(np.zeros(0))), [])
+        self.assertEqual(segmenter.segment(audio(silence(3.0))), [])
+        self.assertEqual(segmenter.segment(audio(voice(120, 0.01))), [])
+# + + + + + Classes + + + + +
+
+
+if __name__ == "__main__":
+    unittest.main()